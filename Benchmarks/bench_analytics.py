@@ -0,0 +1,87 @@
+# Benchmarks/bench_analytics.py
+#
+# Membandingkan tiga cara menghitung pendapatan per produk, top-10
+# produk, dan persentil ukuran keranjang di atas transaksi_item:
+#   - python : loop tuple hasil query (dict + sorted)
+#   - sql    : GROUP BY di SQLite
+#   - numpy  : AnalitikTransaksi (muat kolom per batch + agregasi vektor)
+# Waktu numpy dipisah menjadi muat (SQLite -> array) dan hitung.
+# Butuh NumPy. Jalankan dari root project:
+#     python -m Benchmarks.bench_analytics --baris 10000000
+import argparse
+import os
+import tempfile
+import time
+
+from Benchmarks.util import isi_katalog, isi_riwayat
+from Repository.repository import Database
+from Services.analytics import AnalitikTransaksi
+from Utils.metrics import persentil
+
+
+def cara_python(db):
+    pendapatan = {}
+    ukuran = {}
+    for trx_id, pid, qty, harga in db.iterate(
+        "SELECT transaksi_id, produk_id, qty, harga FROM transaksi_item", (), 100000
+    ):
+        pendapatan[pid] = pendapatan.get(pid, 0.0) + qty * harga
+        ukuran[trx_id] = ukuran.get(trx_id, 0) + qty
+    top = sorted(pendapatan.items(), key=lambda x: x[1], reverse=True)[:10]
+    nilai = list(ukuran.values())
+    return top, [persentil(nilai, p) for p in (50, 95, 99)]
+
+
+def cara_sql(db):
+    top = db.fetchall(
+        "SELECT produk_id, SUM(qty*harga) AS p FROM transaksi_item "
+        "GROUP BY produk_id ORDER BY p DESC LIMIT 10"
+    )
+    # SQLite tidak punya fungsi persentil: ambil nilai terurut lalu pilih indeks
+    nilai = [r[0] for r in db.iterate(
+        "SELECT SUM(qty) AS u FROM transaksi_item GROUP BY transaksi_id ORDER BY u", (), 100000
+    )]
+    return top, [persentil(nilai, p) for p in (50, 95, 99)]
+
+
+def cara_numpy(analitik):
+    ids, nilai = analitik.produkTerlaris(10)
+    return list(zip(ids.tolist(), nilai.tolist())), list(analitik.persentilUkuranKeranjang((50, 95, 99)).values())
+
+
+def ukur(fungsi):
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    return hasil, time.perf_counter() - mulai
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baris", type=int, default=1000000)
+    parser.add_argument("--produk", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), profile="throughput")
+        mulai = time.perf_counter()
+        isi_katalog(db, args.produk)
+        isi_riwayat(db, args.baris)
+        print(f"{args.baris} baris transaksi_item dibuat dalam {time.perf_counter() - mulai:.1f} detik")
+
+        (top_py, p_py), t_py = ukur(lambda: cara_python(db))
+        (top_sql, p_sql), t_sql = ukur(lambda: cara_sql(db))
+        analitik, t_muat = ukur(lambda: AnalitikTransaksi.muat(db))
+        (top_np, p_np), t_np = ukur(lambda: cara_numpy(analitik))
+
+        print(f"{'cara':<14} {'detik':>8} {'baris/detik':>14}")
+        for nama, t in (("python", t_py), ("sql", t_sql), ("numpy muat", t_muat),
+                        ("numpy hitung", t_np), ("numpy total", t_muat + t_np)):
+            print(f"{nama:<14} {t:>8.2f} {args.baris / t:>14,.0f}")
+
+        sama = [a for a, _ in top_py] == [a for a, _ in top_sql] == [a for a, _ in top_np]
+        print(f"top-10 sama: {sama}; persentil 50/95/99 python={p_py} sql={p_sql} numpy={p_np}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Benchmarks/bench_group_commit.py
+#
+# Throughput checkout bersamaan (pesanan/detik) tanpa dan dengan group
+# commit untuk beberapa ukuran window.
+# Jalankan dari root project:
+#     python -m Benchmarks.bench_group_commit --threads 16 --pesanan 3000
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from Benchmarks.util import PaymentDiam, buat_keranjang, isi_produk
+from Repository.repository import Database, ProdukRepository, TransaksiRepository
+from Services.services import CheckoutService
+
+
+def ukur(args, window):
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), pool_size=args.threads + 1, profile=args.profile)
+        isi_produk(db, 50)
+        if window is not None:
+            db.enable_group_commit(window, args.max_batch)
+        service = CheckoutService(TransaksiRepository(db), ProdukRepository(db))
+        per_thread = args.pesanan // args.threads
+        awal = db.commit_stats()["commits"]
+
+        def worker(n):
+            for i in range(per_thread):
+                service.checkout(n, buat_keranjang([(n + i) % 50 + 1]), PaymentDiam())
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+        mulai = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        durasi = time.perf_counter() - mulai
+        commits = db.commit_stats()["commits"] - awal
+        group = db.group_commit_stats()
+        db.close()
+
+    total = per_thread * args.threads
+    label = "off" if window is None else f"{window * 1000:g} ms"
+    rata2 = f"{group['avg_batch']:.1f}" if group else "1.0"
+    print(f"window={label:<8} {total / durasi:>9.1f} pesanan/s  commit={commits:<6} rata2 batch={rata2}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--pesanan", type=int, default=3000)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--window", type=float, action="append", help="dalam milidetik")
+    parser.add_argument("--profile", default="durable")
+    parser.add_argument("--dir", default=None, help="folder database (pakai disk asli, bukan tmpfs)")
+    args = parser.parse_args()
+
+    ukur(args, None)
+    for window in args.window or [0.5, 2, 5]:
+        ukur(args, window / 1000)
+
+
+if __name__ == "__main__":
+    main()
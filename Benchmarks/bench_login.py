@@ -0,0 +1,95 @@
+# Benchmarks/bench_login.py
+#
+# Throughput AuthService.login untuk setiap pengaturan biaya KDF, dengan
+# PasswordHasher memakai 1 worker dan semua core. Kolom "per core" =
+# login/s dibagi jumlah worker; biaya yang cocok biasanya yang masih
+# memberi throughput cukup untuk puncak login dengan jumlah core server.
+# Baris "sha256 lama" hanya mengukur verifikasi hash tanpa salt (format
+# sebelum KDF) sebagai acuan, tanpa query database.
+# Jalankan dari root project:
+#     python -m Benchmarks.bench_login --login 200
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from Repository.repository import Database, UserRepository
+from Services.services import AuthService
+from Utils.metrics import persentil
+from Utils.password import PasswordHasher
+
+PENGATURAN = [
+    ("scrypt n=2^12", {"algoritma": "scrypt", "n": 2**12}),
+    ("scrypt n=2^14", {"algoritma": "scrypt", "n": 2**14}),
+    ("scrypt n=2^15", {"algoritma": "scrypt", "n": 2**15}),
+    ("pbkdf2 100k", {"algoritma": "pbkdf2_sha256", "iterasi": 100000}),
+    ("pbkdf2 600k", {"algoritma": "pbkdf2_sha256", "iterasi": 600000}),
+]
+
+
+def ukur(auth, jumlah, threads):
+    """Login `jumlah` kali dari `threads` thread; mengembalikan (login/s, latensi)."""
+    waktu = []
+    lock = threading.Lock()
+    sisa = iter(range(jumlah))
+
+    def klien():
+        milik = []
+        for _ in sisa:
+            mulai = time.perf_counter()
+            auth.login("bench", "rahasia-bench")
+            milik.append(time.perf_counter() - mulai)
+        with lock:
+            waktu.extend(milik)
+
+    mulai = time.perf_counter()
+    daftar = [threading.Thread(target=klien) for _ in range(threads)]
+    for t in daftar:
+        t.start()
+    for t in daftar:
+        t.join()
+    return jumlah / (time.perf_counter() - mulai), waktu
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--login", type=int, default=100, help="login per pengukuran")
+    parser.add_argument("--workers", type=int, nargs="+", help="ukuran pool (default: 1 dan jumlah CPU)")
+    args = parser.parse_args()
+    semua_core = os.cpu_count() or 1
+    daftar_workers = args.workers or sorted({1, semua_core})
+
+    print(f"{'pengaturan':<14} {'workers':>7} {'login/s':>9} {'per core':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), profile="balanced")
+
+        legacy = PasswordHasher()
+        hash_lama = hashlib.sha256(b"rahasia-bench").hexdigest()
+        mulai = time.perf_counter()
+        for _ in range(args.login * 100):
+            legacy.verify("rahasia-bench", hash_lama)
+        per_detik = args.login * 100 / (time.perf_counter() - mulai)
+        print(f"{'sha256 lama':<14} {1:>7} {per_detik:>9.0f} {per_detik:>9.0f} {'-':>8} {'-':>8}")
+
+        for nama, opsi in PENGATURAN:
+            db.execute("DELETE FROM users WHERE username='bench'")
+            for workers in daftar_workers:
+                hasher = PasswordHasher(workers=workers, **opsi)
+                auth = AuthService(UserRepository(db), hasher)
+                if workers == daftar_workers[0]:
+                    auth.register("bench", "rahasia-bench", "pelanggan")
+                # Pemanasan: proses worker spawn sebelum pengukuran
+                ukur(auth, workers, workers)
+                per_detik, waktu = ukur(auth, args.login, workers * 2)
+                hasher.close()
+                print(
+                    f"{nama:<14} {workers:>7} {per_detik:>9.1f} {per_detik / workers:>9.1f} "
+                    f"{persentil(waktu, 50) * 1000:>8.1f} {persentil(waktu, 99) * 1000:>8.1f}"
+                )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
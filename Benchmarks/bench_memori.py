@@ -0,0 +1,68 @@
+# Benchmarks/bench_memori.py
+#
+# Mengukur memori per produk (tracemalloc) dan waktu baca untuk
+# ProdukRepository.findAll() (list Produk ber-__slots__),
+# findAllBatch() (ProdukBatch kolom array), dan baris tuple mentah.
+# Kolom "versi dict" memakai salinan Produk tanpa __slots__ sebagai
+# pembanding model lama. Waktu diukur dengan tracemalloc aktif, jadi
+# hanya berguna sebagai perbandingan relatif.
+# Jalankan dari root project:
+#     python -m Benchmarks.bench_memori --produk 1000000
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from Benchmarks.util import isi_katalog
+from Repository.repository import Database, ProdukRepository
+
+
+class ProdukDict:
+    """Produk tanpa __slots__ (bentuk model sebelum dipadatkan)."""
+    def __init__(self, id, nama, harga, stok):
+        self._id = id
+        self._nama = nama
+        self._harga = harga
+        self._stok = stok
+
+
+def ukur(fungsi):
+    """Mengembalikan (hasil, byte yang masih teralokasi, detik)."""
+    gc.collect()
+    tracemalloc.start()
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    detik = time.perf_counter() - mulai
+    byte, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return hasil, byte, detik
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--produk", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), profile="balanced")
+        isi_katalog(db, args.produk)
+        repo = ProdukRepository(db)
+
+        kasus = [
+            ("tuple", lambda: db.fetchall("SELECT * FROM produk")),
+            ("versi dict", lambda: [ProdukDict(*r) for r in db.fetchall("SELECT * FROM produk")]),
+            ("findAll", repo.findAll),
+            ("findAllBatch", repo.findAllBatch),
+        ]
+        print(f"{'cara':<14} {'byte/produk':>12} {'total MB':>10} {'detik':>8}")
+        for nama, fungsi in kasus:
+            hasil, byte, detik = ukur(fungsi)
+            print(f"{nama:<14} {byte / len(hasil):>12.1f} {byte / 2**20:>10.1f} {detik:>8.2f}")
+            del hasil
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Benchmarks/bench_pipeline.py
+#
+# Mengukur CheckoutPipeline (antrian + worker + batch) di bawah banjir
+# pesanan dari banyak klien, untuk beberapa ukuran batch.
+# Jalankan dari root project:
+#     python -m Benchmarks.bench_pipeline --klien 8 --pesanan 2000 --workers 4
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from Benchmarks.util import PaymentDiam, buat_keranjang, isi_produk
+from Exceptions.exceptions import AntrianPenuhError
+from Repository.repository import Database, ProdukRepository, TransaksiRepository
+from Services.pipeline import CheckoutPipeline
+from Services.services import CheckoutService
+
+
+def ukur(args, batch_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), pool_size=args.workers, profile=args.profile)
+        isi_produk(db, 20)
+        service = CheckoutService(TransaksiRepository(db), ProdukRepository(db))
+        pipeline = CheckoutPipeline(service, args.workers, args.max_queue, batch_size).start()
+        per_klien = args.pesanan // args.klien
+        tiket = []
+        lock = threading.Lock()
+
+        def klien(n):
+            milik = []
+            for i in range(per_klien):
+                keranjang = buat_keranjang([(n + i) % 20 + 1, (n * 7 + i) % 20 + 1])
+                try:
+                    milik.append(pipeline.submit(n, keranjang, PaymentDiam(), timeout=args.timeout))
+                except AntrianPenuhError:
+                    pass
+            with lock:
+                tiket.extend(milik)
+
+        threads = [threading.Thread(target=klien, args=(n,)) for n in range(args.klien)]
+        mulai = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for t in tiket:
+            try:
+                t.wait()
+            except Exception:
+                pass
+        durasi = time.perf_counter() - mulai
+        pipeline.stop()
+        stats = pipeline.stats()
+        commits = db.commit_stats()["commits"]
+        db.close()
+
+    lat = stats["latency"]
+    print(
+        f"batch={batch_size:<3} {stats['completed'] / durasi:>8.1f} pesanan/s  "
+        f"ditolak={stats['rejected']:<5} commit={commits:<6} "
+        f"rata2 batch={stats['batch']['avg_size']:.1f}  "
+        f"p99 antri={lat['queued']['p99_ms']:.1f}ms total={lat['total']['p99_ms']:.1f}ms"
+    )
+    if args.json:
+        print(json.dumps(stats, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--klien", type=int, default=8)
+    parser.add_argument("--pesanan", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=None, help="0 = tolak langsung jika antrian penuh")
+    parser.add_argument("--batch", type=int, action="append")
+    parser.add_argument("--profile", default="durable")
+    parser.add_argument("--json", action="store_true", help="cetak statistik lengkap")
+    args = parser.parse_args()
+
+    for batch_size in args.batch or [1, 8, 32]:
+        ukur(args, batch_size)
+
+
+if __name__ == "__main__":
+    main()
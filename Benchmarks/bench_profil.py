@@ -0,0 +1,60 @@
+# Benchmarks/bench_profil.py
+#
+# Membandingkan profil storage (durable/balanced/throughput) pada alur
+# checkout, dengan satu atau beberapa thread worker.
+# Jalankan dari root project:
+#     python -m Benchmarks.bench_profil --checkout 300 --lines 5 --threads 4
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from Benchmarks.util import PaymentDiam, buat_keranjang, isi_produk
+from Repository.repository import PROFIL_STORAGE, Database, ProdukRepository, TransaksiRepository
+from Services.services import CheckoutService
+
+
+def ukur(profil, jumlah_checkout, jumlah_baris, jumlah_thread):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), pool_size=jumlah_thread, profile=profil)
+        isi_produk(db, jumlah_baris)
+        service = CheckoutService(TransaksiRepository(db), ProdukRepository(db))
+        keranjang = buat_keranjang(range(1, jumlah_baris + 1))
+        per_thread = jumlah_checkout // jumlah_thread
+
+        def worker():
+            for _ in range(per_thread):
+                service.checkout(2, keranjang, PaymentDiam())
+
+        threads = [threading.Thread(target=worker) for _ in range(jumlah_thread)]
+        mulai = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        durasi = time.perf_counter() - mulai
+        info = db.storage_info()
+        db.close()
+
+    total = per_thread * jumlah_thread
+    print(
+        f"{profil:<11} journal={info['journal_mode']:<7} sync={info['synchronous']}  "
+        f"{total / durasi:>9.1f} checkout/s  ({durasi * 1000 / total:.2f} ms/checkout)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkout", type=int, default=300)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--profile", choices=list(PROFIL_STORAGE), action="append")
+    args = parser.parse_args()
+
+    for profil in args.profile or PROFIL_STORAGE:
+        ukur(profil, args.checkout, args.lines, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Benchmarks/bench_search.py
+#
+# Membandingkan pencarian FTS5 (ProdukRepository.search) dengan baseline
+# LIKE '%q%' pada katalog acak. Kolom "cocok" adalah jumlah produk yang
+# cocok; biaya ranking bm25 sebanding dengan angka ini, sedangkan LIKE
+# sebanding dengan jarak scan sampai LIMIT terpenuhi (lambat untuk query
+# yang jarang cocok).
+# Jalankan dari root project:
+#     python -m Benchmarks.bench_search --produk 1000000
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from Benchmarks.util import isi_katalog
+from Repository.repository import Database, ProdukRepository
+
+QUERY = ["sepatu", "kemeja batik", "jak", "tas kulit garuda", "bromo", "hoodie retro 12"]
+
+
+def ukur(fungsi, ulang):
+    waktu = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        waktu.append((time.perf_counter() - mulai) * 1000)
+    return statistics.median(waktu)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--produk", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--ulang", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), profile="balanced")
+        mulai = time.perf_counter()
+        isi_katalog(db, args.produk)
+        print(f"{args.produk} produk dibuat dalam {time.perf_counter() - mulai:.1f} detik")
+        repo = ProdukRepository(db)
+
+        print(f"{'query':<20} {'FTS5 ms':>9} {'unranked':>9} {'LIKE ms':>9} {'cocok':>7}")
+        for q in QUERY:
+            fts = ukur(lambda: repo.search(q, args.limit), args.ulang)
+            unranked = ukur(lambda: repo.search(q, args.limit, ranked=False), args.ulang)
+            like = ukur(lambda: db.fetchall(
+                "SELECT * FROM produk WHERE nama LIKE ? LIMIT ?", (f"%{q}%", args.limit)
+            ), args.ulang)
+            jumlah = len(repo.search(q, args.produk, ranked=False))
+            print(f"{q:<20} {fts:>9.2f} {unranked:>9.2f} {like:>9.2f} {jumlah:>7}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
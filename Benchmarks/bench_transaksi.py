@@ -0,0 +1,66 @@
+# Benchmarks/bench_transaksi.py
+#
+# Membandingkan commit-per-statement dengan satu commit per checkout.
+# Jalankan dari root project:
+#     python -m Benchmarks.bench_transaksi --checkout 200 --lines 10
+import argparse
+import os
+import tempfile
+import time
+
+from Benchmarks.util import PaymentDiam, buat_keranjang, isi_produk
+from Models.models import Transaksi
+from Repository.repository import Database, ProdukRepository, TransaksiRepository
+from Services.services import CheckoutService
+
+
+def checkout_per_statement(db, user_id, keranjang):
+    """Alur checkout lama: setiap INSERT/UPDATE di-commit sendiri."""
+    produkRepo = ProdukRepository(db)
+    trxRepo = TransaksiRepository(db)
+    items = keranjang.get_items()
+    total = sum(produkRepo.findById(pid).harga * qty for pid, qty in items.items())
+    trx_id = trxRepo.save(Transaksi(None, user_id, total, "selesai"))
+    for pid, qty in items.items():
+        produk = produkRepo.findById(pid)
+        trxRepo.saveItem(trx_id, pid, qty, produk.harga)
+        produk.kurangi_stok(qty)
+        produkRepo.update(produk)
+
+
+def checkout_unit_of_work(db, user_id, keranjang):
+    CheckoutService(TransaksiRepository(db), ProdukRepository(db)).checkout(
+        user_id, keranjang, PaymentDiam()
+    )
+
+
+def ukur(nama, fungsi, jumlah_checkout, jumlah_baris):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        isi_produk(db, jumlah_baris)
+        awal = db.commit_stats()["commits"]
+        mulai = time.perf_counter()
+        for _ in range(jumlah_checkout):
+            fungsi(db, 2, buat_keranjang(range(1, jumlah_baris + 1)))
+        durasi = time.perf_counter() - mulai
+        commits = db.commit_stats()["commits"] - awal
+        db.close()
+
+    print(
+        f"{nama:<20} {jumlah_checkout / durasi:>10.1f} checkout/s  "
+        f"{commits:>7} commit  ({commits / jumlah_checkout:.1f} per checkout)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkout", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=10)
+    args = parser.parse_args()
+
+    ukur("commit-per-statement", checkout_per_statement, args.checkout, args.lines)
+    ukur("unit-of-work", checkout_unit_of_work, args.checkout, args.lines)
+
+
+if __name__ == "__main__":
+    main()
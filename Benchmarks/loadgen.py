@@ -0,0 +1,356 @@
+# Benchmarks/loadgen.py
+#
+# Load generator tanpa UI: N pelanggan virtual menjalankan alur menu
+# pelanggan (register, login, lalu browse / cari / tambah ke keranjang /
+# lihat keranjang / checkout / riwayat sesuai bobot --mix, dengan think
+# time acak di antaranya) terhadap AuthService, ProdukService,
+# CheckoutService, dan repository yang sama dengan main.App.
+#
+# Beberapa nilai --klien dijalankan berurutan (database baru per langkah)
+# untuk mencari titik jenuh: throughput berhenti naik sementara p99 dan
+# error terus naik. Dengan --proses > 1 pelanggan dibagi ke beberapa
+# proses (masing-masing dengan thread dan koneksi sendiri).
+# Jalankan dari root project:
+#     python -m Benchmarks.loadgen --klien 1 4 16 64 --durasi 10 --think 50
+#     python -m Benchmarks.loadgen --klien 32 --proses 4 --mix browse=20,checkout=80 --json beban.json
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from Benchmarks.util import KATA_PRODUK, PaymentDiam, isi_katalog
+from Exceptions.exceptions import ProdukTidakDitemukanError
+from Models.models import Keranjang
+from Repository.repository import (
+    PROFIL_STORAGE,
+    CachedProdukRepository,
+    Database,
+    TransaksiRepository,
+    UserRepository
+)
+from Services.gateway import GatewayPayment, MockGateway
+from Services.services import AuthService, CheckoutService, ProdukService
+from Utils.metrics import persentil
+from Utils.password import PasswordHasher
+
+AKSI = ("browse", "cari", "tambah", "lihat", "checkout", "riwayat")
+MIX_DEFAULT = "browse=40,cari=10,tambah=25,lihat=5,checkout=12,riwayat=8"
+
+
+def parse_mix(teks):
+    """'browse=40,checkout=10' -> {'browse': 40.0, 'checkout': 10.0}"""
+    mix = {}
+    for bagian in teks.split(","):
+        aksi, _, bobot = bagian.partition("=")
+        aksi = aksi.strip()
+        if aksi not in AKSI:
+            raise argparse.ArgumentTypeError(f"Aksi '{aksi}' tidak dikenal, pilih dari: {', '.join(AKSI)}")
+        mix[aksi] = float(bobot)
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("Total bobot --mix harus > 0")
+    return mix
+
+
+class Hasil:
+    """
+    Latensi per aksi (berhasil dan gagal terpisah) dan jumlah error per
+    (aksi, jenis exception).
+    """
+    def __init__(self):
+        self.latensi = {}
+        self.latensi_error = {}
+        self.error = Counter()
+        self._lock = threading.Lock()
+
+    def catat(self, aksi, detik, error=None):
+        with self._lock:
+            if error is None:
+                self.latensi.setdefault(aksi, []).append(detik)
+            else:
+                self.latensi_error.setdefault(aksi, []).append(detik)
+                self.error[(aksi, type(error).__name__)] += 1
+
+    def data(self):
+        """Bentuk dict biasa (bisa di-pickle dari proses worker)."""
+        with self._lock:
+            return {
+                "latensi": dict(self.latensi),
+                "latensi_error": dict(self.latensi_error),
+                "error": dict(self.error),
+            }
+
+    def gabung(self, data):
+        with self._lock:
+            for aksi, nilai in data["latensi"].items():
+                self.latensi.setdefault(aksi, []).extend(nilai)
+            for aksi, nilai in data["latensi_error"].items():
+                self.latensi_error.setdefault(aksi, []).extend(nilai)
+            self.error.update(data["error"])
+
+
+class Layanan:
+    """Service dan repository yang dipakai bersama semua pelanggan satu proses."""
+    def __init__(self, path, opsi):
+        self.db = Database(path, pool_size=opsi["pool"], profile=opsi["profile"])
+        if opsi["group_commit"]:
+            self.db.enable_group_commit(opsi["group_commit"] / 1000)
+        self.produkRepo = CachedProdukRepository(self.db)
+        self.trxRepo = TransaksiRepository(self.db)
+        self.hasher = PasswordHasher(workers=None)
+        self.auth = AuthService(UserRepository(self.db), self.hasher)
+        self.produk = ProdukService(self.produkRepo)
+        self.checkout = CheckoutService(self.trxRepo, self.produkRepo)
+        if opsi["gateway_ms"]:
+            self.payment = GatewayPayment(
+                MockGateway(latency=opsi["gateway_ms"] / 1000, jitter=opsi["gateway_ms"] / 4000),
+                max_concurrency=1000
+            )
+        else:
+            self.payment = PaymentDiam()
+        self.jumlah_produk = self.db.fetchone("SELECT MAX(id) FROM produk")[0] or 1
+
+    def close(self):
+        if isinstance(self.payment, GatewayPayment):
+            self.payment.close()
+        # Pool hasher harus ditutup eksplisit: di proses anak multiprocessing
+        # worker pool yang tersisa membuat proses tidak pernah selesai
+        self.hasher.close()
+        self.db.close()
+
+
+class Pelanggan:
+    """
+    Satu pelanggan virtual: register dan login sekali, lalu memilih aksi
+    acak menurut bobot mix sampai waktu habis.
+    """
+    def __init__(self, nama, layanan: Layanan, opsi, hasil: Hasil, seed):
+        self._nama = nama
+        self._layanan = layanan
+        self._opsi = opsi
+        self._hasil = hasil
+        self._rng = random.Random(seed)
+        self._keranjang = Keranjang()
+        self._user_id = None
+        self._aksi = list(opsi["mix"])
+        self._bobot = list(opsi["mix"].values())
+
+    def _ukur(self, aksi, fungsi):
+        mulai = time.perf_counter()
+        try:
+            hasil = fungsi()
+        except Exception as e:
+            # Waktu aksi yang gagal tetap dicatat: error lambat (misal
+            # PoolKoneksiHabisError setelah menunggu pool) adalah ekor latensi
+            self._hasil.catat(aksi, time.perf_counter() - mulai, e)
+            return None, e
+        self._hasil.catat(aksi, time.perf_counter() - mulai)
+        return hasil, None
+
+    def _think(self):
+        if self._opsi["think_ms"]:
+            time.sleep(self._rng.expovariate(1000 / self._opsi["think_ms"]))
+
+    def jalankan(self, sampai):
+        password = f"rahasia-{self._nama}"
+        _, error = self._ukur("register", lambda: self._layanan.auth.register(self._nama, password, "pelanggan"))
+        if error is not None:
+            return
+        user, error = self._ukur("login", lambda: self._layanan.auth.login(self._nama, password))
+        if error is not None:
+            return
+        self._user_id = user[0]
+
+        while time.perf_counter() < sampai:
+            self._think()
+            aksi = self._rng.choices(self._aksi, self._bobot)[0]
+            if aksi == "checkout" and not self._keranjang.get_items():
+                aksi = "tambah"
+            self._ukur(aksi, getattr(self, f"_{aksi}"))
+
+    def _browse(self):
+        after_id = self._rng.randint(0, self._layanan.jumlah_produk)
+        return self._layanan.produkRepo.findPage(after_id, 20)
+
+    def _cari(self):
+        return self._layanan.produk.cariProduk(self._rng.choice(KATA_PRODUK))
+
+    def _tambah(self):
+        pid = self._rng.randint(1, self._layanan.jumlah_produk)
+        if not self._layanan.produkRepo.findById(pid):
+            raise ProdukTidakDitemukanError(f"Produk dengan ID {pid} tidak ditemukan")
+        self._keranjang.tambah(pid, self._rng.randint(1, self._opsi["qty_maks"]))
+
+    def _lihat(self):
+        return self._layanan.produkRepo.findByIds(self._keranjang.get_items().keys())
+
+    def _checkout(self):
+        try:
+            trx_id = self._layanan.checkout.checkout(self._user_id, self._keranjang, self._layanan.payment)
+            return self._layanan.trxRepo.findDetailByTransaksi(trx_id)
+        finally:
+            # Berhasil atau gagal (misal stok habis), pelanggan mulai dari keranjang baru
+            self._keranjang.kosongkan()
+
+    def _riwayat(self):
+        return self._layanan.trxRepo.findByUser(self._user_id)
+
+
+def jalankan_beban(path, klien, opsi, prefix, seed):
+    """
+    Menjalankan `klien` pelanggan sebagai thread di proses ini selama
+    opsi["durasi"] detik. Mengembalikan Hasil.data().
+    """
+    layanan = Layanan(path, opsi)
+    hasil = Hasil()
+    sampai = time.perf_counter() + opsi["durasi"]
+    threads = [
+        threading.Thread(
+            target=Pelanggan(f"{prefix}-{i}", layanan, opsi, hasil, seed * 100003 + i).jalankan,
+            args=(sampai,)
+        )
+        for i in range(klien)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    layanan.close()
+    return hasil.data()
+
+
+def ringkas(hasil: Hasil, klien, durasi):
+    aksi = {}
+    total_ok = total_error = 0
+    for nama in ("register", "login") + AKSI:
+        waktu = hasil.latensi.get(nama, [])
+        waktu_error = hasil.latensi_error.get(nama, [])
+        error = {jenis: n for (a, jenis), n in hasil.error.items() if a == nama}
+        jumlah_error = sum(error.values())
+        if not waktu and not jumlah_error:
+            continue
+        total_ok += len(waktu)
+        total_error += jumlah_error
+        # Persentil dihitung dari semua aksi (berhasil + gagal), seperti
+        # yang dialami pelanggan; p99 error juga dilaporkan terpisah
+        semua = waktu + waktu_error
+        aksi[nama] = {
+            "ok": len(waktu),
+            "error": error,
+            "error_rate": jumlah_error / (len(waktu) + jumlah_error),
+            "per_detik": len(waktu) / durasi,
+            "p50_ms": persentil(semua, 50) * 1000,
+            "p95_ms": persentil(semua, 95) * 1000,
+            "p99_ms": persentil(semua, 99) * 1000,
+            "max_ms": max(semua, default=0.0) * 1000,
+            "p99_ok_ms": persentil(waktu, 99) * 1000,
+            "p99_error_ms": persentil(waktu_error, 99) * 1000,
+        }
+    return {
+        "klien": klien,
+        "durasi": durasi,
+        "throughput": total_ok / durasi,
+        "checkout_per_detik": aksi.get("checkout", {}).get("per_detik", 0.0),
+        "error_rate": total_error / max(1, total_ok + total_error),
+        "aksi": aksi,
+    }
+
+
+def langkah(klien, args, opsi):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "beban.db")
+        db = Database(path, profile=args.profile)
+        isi_katalog(db, args.produk, args.seed)
+        if args.stok is not None:
+            db.execute("UPDATE produk SET stok = ?", (args.stok,))
+        db.close()
+
+        hasil = Hasil()
+        if args.proses <= 1:
+            hasil.gabung(jalankan_beban(path, klien, opsi, f"k{klien}", args.seed))
+        else:
+            bagian = [klien // args.proses + (1 if i < klien % args.proses else 0) for i in range(args.proses)]
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(args.proses, mp_context=ctx) as pool:
+                futures = [
+                    pool.submit(jalankan_beban, path, n, opsi, f"k{klien}p{i}", args.seed + i)
+                    for i, n in enumerate(bagian) if n
+                ]
+                for f in futures:
+                    hasil.gabung(f.result())
+    # Laju dihitung terhadap durasi beban, tanpa waktu start proses worker
+    return ringkas(hasil, klien, args.durasi)
+
+
+def cetak(r):
+    print(
+        f"== {r['klien']} klien: {r['throughput']:.1f} aksi/s, "
+        f"{r['checkout_per_detik']:.1f} checkout/s, error {r['error_rate'] * 100:.2f}%"
+    )
+    print(
+        f"{'aksi':<10} {'ok':>7} {'/detik':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'err %':>6} {'p99 err':>8}  error"
+    )
+    for nama, a in r["aksi"].items():
+        error = ", ".join(f"{jenis}={n}" for jenis, n in a["error"].items())
+        print(
+            f"{nama:<10} {a['ok']:>7} {a['per_detik']:>8.1f} {a['p50_ms']:>8.2f} {a['p95_ms']:>8.2f} "
+            f"{a['p99_ms']:>8.2f} {a['error_rate'] * 100:>6.2f} {a['p99_error_ms']:>8.2f}  {error}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--klien", type=int, nargs="+", default=[1, 4, 16], help="jumlah pelanggan per langkah")
+    parser.add_argument("--durasi", type=float, default=10.0, help="detik per langkah")
+    parser.add_argument("--think", type=float, default=50.0, help="rata-rata think time (ms, eksponensial)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(MIX_DEFAULT), help=f"default: {MIX_DEFAULT}")
+    parser.add_argument("--proses", type=int, default=1, help="jumlah proses worker (1 = thread saja)")
+    parser.add_argument("--pool", type=int, default=4, help="pool_size Database per proses")
+    parser.add_argument("--profile", default="durable", choices=list(PROFIL_STORAGE))
+    parser.add_argument("--group-commit", type=float, default=0, help="window group commit (ms), 0 = mati")
+    parser.add_argument("--gateway", type=float, default=0, help="latensi MockGateway (ms), 0 = bayar instan")
+    parser.add_argument("--produk", type=int, default=1000)
+    parser.add_argument("--stok", type=int, help="stok awal semua produk (default: acak 0-500)")
+    parser.add_argument("--qty-maks", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil semua langkah ke file JSON")
+    args = parser.parse_args()
+
+    opsi = {
+        "durasi": args.durasi,
+        "think_ms": args.think,
+        "mix": args.mix,
+        "pool": args.pool,
+        "profile": args.profile,
+        "group_commit": args.group_commit,
+        "gateway_ms": args.gateway,
+        "qty_maks": args.qty_maks,
+    }
+    semua = []
+    for klien in args.klien:
+        r = langkah(klien, args, opsi)
+        cetak(r)
+        semua.append(r)
+
+    if len(semua) > 1:
+        print(f"{'klien':>6} {'aksi/s':>9} {'checkout/s':>11} {'p99 checkout ms':>16} {'error %':>8}")
+        for r in semua:
+            p99 = r["aksi"].get("checkout", {}).get("p99_ms", 0.0)
+            print(
+                f"{r['klien']:>6} {r['throughput']:>9.1f} {r['checkout_per_detik']:>11.1f} "
+                f"{p99:>16.2f} {r['error_rate'] * 100:>8.2f}"
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"opsi": opsi, "langkah": semua}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
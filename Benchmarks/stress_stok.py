@@ -0,0 +1,85 @@
+# Benchmarks/stress_stok.py
+#
+# Stress test checkout bersamaan: banyak worker membeli produk yang sama
+# dengan stok terbatas. Di akhir dicek bahwa stok tidak pernah negatif dan
+# tidak ada update yang hilang (stok awal - stok akhir == qty terjual).
+# Keluar dengan status 1 jika invarian dilanggar.
+# Jalankan dari root project:
+#     python -m Benchmarks.stress_stok --threads 8 --stok 500
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from Benchmarks.util import PaymentDiam, buat_keranjang, isi_produk
+from Exceptions.exceptions import StokTidakCukupError
+from Repository.repository import Database, ProdukRepository, TransaksiRepository
+from Services.services import CheckoutService
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--produk", type=int, default=3)
+    parser.add_argument("--stok", type=int, default=500)
+    parser.add_argument("--percobaan", type=int, default=200, help="checkout per thread")
+    parser.add_argument("--profile", default="balanced")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--group-commit", type=float, default=None, help="window group commit (ms)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "stress.db"), pool_size=args.threads, profile=args.profile)
+        isi_produk(db, args.produk, stok=args.stok)
+        if args.group_commit is not None:
+            db.enable_group_commit(args.group_commit / 1000)
+        produkRepo = ProdukRepository(db)
+        service = CheckoutService(TransaksiRepository(db), produkRepo)
+
+        lock = threading.Lock()
+        hasil = {"sukses": 0, "stok_habis": 0}
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(args.percobaan):
+                pids = rng.sample(range(1, args.produk + 1), rng.randint(1, args.produk))
+                keranjang = buat_keranjang(pids, qty=rng.randint(1, 3))
+                try:
+                    service.checkout(2, keranjang, PaymentDiam())
+                    key = "sukses"
+                except StokTidakCukupError:
+                    key = "stok_habis"
+                with lock:
+                    hasil[key] += 1
+
+        threads = [threading.Thread(target=worker, args=(args.seed + i,)) for i in range(args.threads)]
+        mulai = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        durasi = time.perf_counter() - mulai
+
+        ok = True
+        for pid in range(1, args.produk + 1):
+            stok = produkRepo.findById(pid).stok
+            terjual = db.fetchone(
+                "SELECT COALESCE(SUM(qty), 0) FROM transaksi_item WHERE produk_id=?", (pid,)
+            )[0]
+            valid = stok >= 0 and args.stok - stok == terjual
+            ok = ok and valid
+            print(f"produk {pid}: stok akhir {stok}, terjual {terjual} {'OK' if valid else 'GAGAL'}")
+        db.close()
+
+    print(
+        f"{hasil['sukses']} checkout sukses, {hasil['stok_habis']} ditolak stok habis, "
+        f"{durasi:.2f} detik"
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# Benchmarks/suite.py
+#
+# Benchmark alur inti dengan data deterministik (seed tetap), hasilnya
+# ditulis ke JSON agar bisa dibandingkan antar commit:
+#   login       AuthService.login
+#   findAll     ProdukRepository.findAll
+#   findById    ProdukRepository.findById (id acak)
+#   checkout_N  CheckoutService.checkout dengan N item per keranjang
+#   findByUser  TransaksiRepository.findByUser (user acak)
+# Setiap skala dijalankan di proses terpisah, jadi peak RSS per skala.
+#
+# Skala bawaan: 1k (1.000 produk, 10.000 baris riwayat), 100k (100.000
+# produk, 1 juta baris), 1m (1 juta produk, 10 juta baris).
+# Jalankan dari root project:
+#     python -m Benchmarks.suite --skala 1k 100k --out hasil.json
+#     python -m Benchmarks.suite --skala 1m --cache /data/bench --banding hasil_lama.json
+# --cache menyimpan database hasil generator agar run berikutnya cukup
+# menyalinnya (checkout menambah data, jadi setiap run memakai salinan).
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from Benchmarks.util import PaymentDiam, buat_keranjang, isi_katalog, isi_riwayat
+from Repository.repository import Database, ProdukRepository, TransaksiRepository, UserRepository
+from Services.services import AuthService, CheckoutService
+from Utils.metrics import persentil
+from Utils.password import PasswordHasher
+
+SKALA = {
+    "1k": {"produk": 1000, "baris": 10000},
+    "100k": {"produk": 100000, "baris": 1000000},
+    "1m": {"produk": 1000000, "baris": 10000000},
+}
+UKURAN_KERANJANG = (1, 5, 20, 50)
+USERS = 1000
+LOGIN_USERS = 50
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS byte
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024
+
+
+def versi_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def buat_data(path, produk, baris, seed):
+    """Membangun database benchmark: katalog, user login, dan riwayat."""
+    db = Database(path, profile="throughput")
+    isi_katalog(db, produk, seed)
+    auth = AuthService(UserRepository(db))
+    with db.transaction():
+        for i in range(LOGIN_USERS):
+            auth.register(f"bench{i}", f"rahasia{i}", "pelanggan")
+    isi_riwayat(db, baris, USERS, seed)
+    db.close()
+
+
+def siapkan_database(tmp, cache, produk, baris, seed):
+    """
+    Mengembalikan (path database kerja, detik generator). Dengan cache,
+    database dibangun sekali per (produk, baris, seed) lalu disalin.
+    """
+    kerja = os.path.join(tmp, "bench.db")
+    mulai = time.perf_counter()
+    if cache is None:
+        buat_data(kerja, produk, baris, seed)
+        return kerja, time.perf_counter() - mulai
+
+    os.makedirs(cache, exist_ok=True)
+    template = os.path.join(cache, f"bench_{produk}_{baris}_{seed}.db")
+    if not os.path.exists(template):
+        buat_data(template + ".tmp", produk, baris, seed)
+        os.replace(template + ".tmp", template)
+    # Salin lewat backup API agar aman walau file sumber memakai WAL
+    sumber = sqlite3.connect(template)
+    tujuan = sqlite3.connect(kerja)
+    sumber.backup(tujuan)
+    sumber.close()
+    tujuan.close()
+    return kerja, time.perf_counter() - mulai
+
+
+def ukur(fungsi, jumlah, pemanasan=10):
+    """
+    Menjalankan fungsi(i) `jumlah` kali (setelah beberapa panggilan
+    pemanasan untuk cache SQLite) dan meringkas latensinya.
+    """
+    for i in range(min(pemanasan, jumlah)):
+        fungsi(i)
+    waktu = []
+    mulai = time.perf_counter()
+    for i in range(jumlah):
+        t = time.perf_counter()
+        fungsi(i)
+        waktu.append(time.perf_counter() - t)
+    total = time.perf_counter() - mulai
+    return {
+        "ops": len(waktu),
+        "ops_per_detik": len(waktu) / total,
+        "p50_ms": persentil(waktu, 50) * 1000,
+        "p95_ms": persentil(waktu, 95) * 1000,
+        "p99_ms": persentil(waktu, 99) * 1000,
+        "max_ms": max(waktu) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def jalankan_skala(nama, produk, baris, seed, cache, jumlah):
+    with tempfile.TemporaryDirectory() as tmp:
+        path, generate = siapkan_database(tmp, cache, produk, baris, seed)
+        db = Database(path)
+        rng = random.Random(seed)
+        hasher = PasswordHasher(workers=None)
+        auth = AuthService(UserRepository(db), hasher)
+        produkRepo = ProdukRepository(db)
+        trxRepo = TransaksiRepository(db)
+        checkout = CheckoutService(trxRepo, produkRepo)
+
+        ops = {}
+        # Login memakai KDF (puluhan ms per login), jadi jumlahnya dikurangi
+        ops["login"] = ukur(
+            lambda i: auth.login(f"bench{i % LOGIN_USERS}", f"rahasia{i % LOGIN_USERS}"), max(20, jumlah // 10)
+        )
+        ops["findAll"] = ukur(lambda i: produkRepo.findAll(), 3 if produk >= 100000 else 20, pemanasan=1)
+        ops["findById"] = ukur(lambda i: produkRepo.findById(rng.randint(1, produk)), jumlah * 5)
+        ops["findByUser"] = ukur(lambda i: trxRepo.findByUser(rng.randint(1, USERS)), jumlah)
+
+        # Stok diisi penuh agar checkout tidak gagal; data ini hanya salinan
+        db.execute("UPDATE produk SET stok = 1000000000")
+        for n in UKURAN_KERANJANG:
+            n = min(n, produk)
+            ops[f"checkout_{n}"] = ukur(
+                lambda i: checkout.checkout(
+                    rng.randint(1, USERS), buat_keranjang(rng.sample(range(1, produk + 1), n)), PaymentDiam()
+                ),
+                jumlah
+            )
+        # Pool hasher ditutup eksplisit agar proses skala bisa selesai
+        hasher.close()
+        db.close()
+
+    return {
+        "skala": nama,
+        "produk": produk,
+        "baris": baris,
+        "generate_detik": generate,
+        "ops": ops,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _anak(antrian, *args):
+    antrian.put(jalankan_skala(*args))
+
+
+def jalankan_terpisah(*args):
+    """Menjalankan satu skala di proses baru (peak RSS tidak tercampur)."""
+    ctx = multiprocessing.get_context("spawn")
+    antrian = ctx.Queue()
+    proses = ctx.Process(target=_anak, args=(antrian, *args))
+    proses.start()
+    while True:
+        try:
+            hasil = antrian.get(timeout=1)
+            break
+        except queue.Empty:
+            if not proses.is_alive():
+                raise RuntimeError(f"Benchmark skala {args[0]} gagal (exit code {proses.exitcode})")
+    proses.join()
+    return hasil
+
+
+def cetak(hasil, lama=None):
+    acuan = {}
+    for skala in (lama or {}).get("hasil", []):
+        for op, data in skala["ops"].items():
+            acuan[(skala["skala"], op)] = data["ops_per_detik"]
+
+    for skala in hasil["hasil"]:
+        print(
+            f"== {skala['skala']}: {skala['produk']} produk, {skala['baris']} baris riwayat, "
+            f"data {skala['generate_detik']:.1f} detik, peak RSS {skala['peak_rss_mb']:.0f} MB"
+        )
+        print(f"{'operasi':<14} {'ops/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'banding':>9}")
+        for op, d in skala["ops"].items():
+            lalu = acuan.get((skala["skala"], op))
+            banding = f"{(d['ops_per_detik'] / lalu - 1) * 100:+.1f}%" if lalu else ""
+            print(
+                f"{op:<14} {d['ops_per_detik']:>10.1f} {d['p50_ms']:>8.3f} "
+                f"{d['p95_ms']:>8.3f} {d['p99_ms']:>8.3f} {banding:>9}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skala", nargs="+", default=["1k"], choices=list(SKALA))
+    parser.add_argument("--produk", type=int, help="ganti jumlah produk skala")
+    parser.add_argument("--baris", type=int, help="ganti jumlah baris riwayat skala")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jumlah", type=int, default=500, help="operasi per pengukuran")
+    parser.add_argument("--cache", help="folder penyimpanan database hasil generator")
+    parser.add_argument("--out", default="bench_hasil.json")
+    parser.add_argument("--banding", help="file JSON hasil run sebelumnya")
+    args = parser.parse_args()
+
+    hasil = {
+        "meta": {
+            "commit": versi_commit(),
+            "waktu": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "jumlah": args.jumlah,
+        },
+        "hasil": [],
+    }
+    for nama in args.skala:
+        produk = args.produk or SKALA[nama]["produk"]
+        baris = args.baris if args.baris is not None else SKALA[nama]["baris"]
+        hasil["hasil"].append(jalankan_terpisah(nama, produk, baris, args.seed, args.cache, args.jumlah))
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(hasil, f, indent=2)
+
+    lama = None
+    if args.banding:
+        with open(args.banding, encoding="utf-8") as f:
+            lama = json.load(f)
+    cetak(hasil, lama)
+    print(f"Hasil ditulis ke {args.out}")
+
+
+if __name__ == "__main__":
+    main()
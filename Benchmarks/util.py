@@ -0,0 +1,105 @@
+# Benchmarks/util.py
+#
+# Helper bersama untuk script benchmark.
+import random
+
+from Models.models import Keranjang
+from Repository.repository import ProdukRepository, TransaksiRepository
+from Services.services import Payment
+
+
+class PaymentDiam(Payment):
+    """Payment tanpa output agar tidak mengganggu pengukuran."""
+    def bayar(self, total):
+        pass
+
+
+def isi_produk(db, jumlah, stok=10**9):
+    """Mengisi tabel produk dalam satu transaksi."""
+    produkRepo = ProdukRepository(db)
+    with db.transaction():
+        for i in range(jumlah):
+            produkRepo.save(f"Produk {i}", 1000 + i, stok)
+
+
+def buat_keranjang(produk_ids, qty=1):
+    keranjang = Keranjang()
+    for pid in produk_ids:
+        keranjang.tambah(pid, qty)
+    return keranjang
+
+
+KATA_PRODUK = [
+    "Sepatu", "Kaos", "Kemeja", "Celana", "Jaket", "Tas", "Topi", "Sandal",
+    "Jam", "Dompet", "Kacamata", "Sabuk", "Hoodie", "Rok", "Syal", "Kaus Kaki",
+]
+KATA_SIFAT = [
+    "Pria", "Wanita", "Anak", "Olahraga", "Kulit", "Katun", "Denim", "Batik",
+    "Premium", "Casual", "Formal", "Gunung", "Pantai", "Polos", "Motif", "Retro",
+]
+KATA_MEREK = [
+    "Nusantara", "Garuda", "Merapi", "Rinjani", "Bromo", "Toba", "Komodo",
+    "Cendrawasih", "Borobudur", "Mahakam", "Krakatau", "Bunaken",
+]
+
+
+def nama_produk(rng):
+    """Nama produk acak (deterministik untuk rng yang di-seed)."""
+    return (
+        f"{rng.choice(KATA_PRODUK)} {rng.choice(KATA_SIFAT)} "
+        f"{rng.choice(KATA_MEREK)} {rng.randint(1, 9999)}"
+    )
+
+
+def isi_katalog(db, jumlah, seed=42, batch=10000):
+    """
+    Mengisi katalog produk acak dengan seed tetap, per batch executemany.
+    """
+    rng = random.Random(seed)
+    sisa = jumlah
+    while sisa > 0:
+        n = min(batch, sisa)
+        rows = [(nama_produk(rng), rng.randint(10, 5000) * 100, rng.randint(0, 500)) for _ in range(n)]
+        with db.transaction():
+            db.executemany("INSERT INTO produk(nama,harga,stok) VALUES (?,?,?)", rows)
+        sisa -= n
+
+
+METODE = ["CreditCard", "COD", "EWallet"]
+
+
+def isi_riwayat(db, baris, users=1000, seed=42, batch=100000):
+    """
+    Mengisi riwayat transaksi acak (1-8 item per transaksi, harga produk
+    bervariasi +-20%) untuk produk yang sudah ada, dengan seed tetap, per
+    batch executemany. Tabel ringkasan dibangun ulang di akhir.
+    """
+    rng = random.Random(seed)
+    harga = dict(db.fetchall("SELECT id, harga FROM produk"))
+    ids = list(harga)
+    awal = db.fetchone("SELECT COALESCE(MAX(id), 0) FROM transaksi")[0]
+
+    trx_id = awal
+    dibuat = 0
+    while dibuat < baris:
+        trx, item = [], []
+        while len(item) < batch and dibuat + len(item) < baris:
+            trx_id += 1
+            total = 0
+            for pid in rng.sample(ids, min(len(ids), rng.randint(1, 8))):
+                qty = rng.randint(1, 5)
+                h = round(harga[pid] * rng.uniform(0.8, 1.2), 2)
+                item.append((trx_id, pid, qty, h))
+                total += qty * h
+            trx.append((trx_id, rng.randint(1, users), total, rng.choice(METODE), f"+{rng.randint(0, 364)} days"))
+        with db.transaction():
+            db.executemany(
+                "INSERT INTO transaksi(id,user_id,total,status,metode,created_at) "
+                "VALUES (?,?,?,'selesai',?,datetime('2025-01-01', ?))",
+                trx
+            )
+            db.executemany(
+                "INSERT INTO transaksi_item(transaksi_id,produk_id,qty,harga) VALUES (?,?,?,?)", item
+            )
+        dibuat += len(item)
+    TransaksiRepository(db).rebuildRingkasan()
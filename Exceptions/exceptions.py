@@ -17,3 +17,15 @@ class UsernameSudahAdaError(AuthError):
     pass
 class LoginGagalError(AuthError): 
     pass
+class DatabaseError(EcommerceError): 
+    pass
+class PoolKoneksiHabisError(DatabaseError): 
+    pass
+class PembayaranGagalError(EcommerceError): 
+    pass
+class PembayaranDitolakError(PembayaranGagalError): 
+    pass
+class PembayaranTimeoutError(PembayaranGagalError): 
+    pass
+class AntrianPenuhError(EcommerceError): 
+    pass
@@ -1,4 +1,6 @@
 # Models/models.py
+from array import array
+
 from Exceptions.exceptions import StokTidakCukupError
 
 
@@ -6,6 +8,7 @@ class User:
     """
     Kelas dasar (parent) untuk semua jenis user.
     """
+    __slots__ = ("_id", "_username")
 
     def __init__(self, id, username):
         self._id = id
@@ -27,17 +30,21 @@ class User:
 
 
 class Pelanggan(User):
-    pass
+    __slots__ = ()
 
 
 class Admin(User):
-    pass
+    __slots__ = ()
 
 
 class Produk:
     """
     Representasi produk di sistem.
     """
+    # __slots__: tanpa __dict__ per objek, jadi findAll() pada katalog
+    # besar jauh lebih hemat memori
+    __slots__ = ("_id", "_nama", "_harga", "_stok")
+
     def __init__(self, id, nama, harga, stok):
         self._id = id
         self._nama = nama
@@ -81,10 +88,59 @@ class Produk:
         self._stok -= qty
 
 
+class ProdukBatch:
+    """
+    Kumpulan produk dalam bentuk kolom: array id/harga/stok dan list nama.
+    Dipakai repository untuk pembacaan massal; satu produk memakan
+    beberapa byte per kolom, bukan satu objek Produk per baris.
+    Objek Produk hanya dibuat saat diakses lewat indeks atau iterasi.
+    """
+    __slots__ = ("ids", "nama", "harga", "stok")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.nama = []
+        self.harga = array("d")
+        self.stok = array("q")
+
+    @classmethod
+    def dari_baris(cls, rows):
+        """
+        Membuat batch dari baris (id, nama, harga, stok), misal hasil query.
+        """
+        batch = cls()
+        for id, nama, harga, stok in rows:
+            batch.tambah(id, nama, harga, stok)
+        return batch
+
+    def tambah(self, id, nama, harga, stok):
+        self.ids.append(id)
+        self.nama.append(nama)
+        self.harga.append(harga)
+        self.stok.append(stok)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return Produk(self.ids[i], self.nama[i], self.harga[i], self.stok[i])
+
+    def __iter__(self):
+        return map(Produk, self.ids, self.nama, self.harga, self.stok)
+
+    def get_produk(self):
+        """
+        Mengubah seluruh batch menjadi list Produk.
+        """
+        return list(self)
+
+
 class Keranjang:
     """
     Menyimpan daftar produk yang ingin dibeli pelanggan.
     """
+    __slots__ = ("_items",)
+
     def __init__(self):
         self._items = {}
 
@@ -119,11 +175,14 @@ class Transaksi:
     """
     Representasi transaksi pembayaran.
     """
-    def __init__(self, id, user_id, total, status):
+    __slots__ = ("_id", "_user_id", "_total", "_status", "_metode")
+
+    def __init__(self, id, user_id, total, status, metode=None):
         self._id = id
         self._user_id = user_id
         self._total = total
         self._status = status
+        self._metode = metode
 
     @property
     def id(self):
@@ -149,4 +208,8 @@ class Transaksi:
     def status(self, value):
         if not value:
             raise ValueError("Status tidak boleh kosong")
-        self._status = value
\ No newline at end of file
+        self._status = value
+
+    @property
+    def metode(self):
+        return self._metode
@@ -0,0 +1,97 @@
+# Repository/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Cache in-process dengan batas jumlah entri (LRU) dan umur entri (TTL).
+    Aman dipakai banyak thread.
+
+    Setiap delete/clear menaikkan nomor generasi. Pembaca mengambil
+    generasi() sebelum membaca database lalu memberikannya ke set(); jika
+    ada invalidasi di antaranya, hasil bacaan yang mungkin basi tidak
+    disimpan.
+    """
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize minimal 1")
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        self._invalidations = 0
+        self._generasi = 0
+        self._ditolak = 0
+
+    def generasi(self):
+        with self._lock:
+            return self._generasi
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            value, expires = entry
+            if expires <= self._clock():
+                del self._data[key]
+                self._expired += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, generasi=None):
+        """
+        Menyimpan value. Jika `generasi` diberikan dan sudah ada invalidasi
+        sejak generasi itu, value tidak disimpan (mengembalikan False).
+        """
+        with self._lock:
+            if generasi is not None and generasi != self._generasi:
+                self._ditolak += 1
+                return False
+            self._data[key] = (value, self._clock() + self._ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            # Generasi selalu naik, walau key belum ada: pembaca yang sedang
+            # berjalan mungkin akan menyimpannya
+            self._generasi += 1
+            if self._data.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generasi += 1
+            self._invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self._maxsize,
+                "ttl": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "invalidations": self._invalidations,
+                "stale_sets": self._ditolak,
+            }
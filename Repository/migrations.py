@@ -0,0 +1,173 @@
+# Repository/migrations.py
+#
+# Migrasi schema berurutan. Versi schema disimpan di PRAGMA user_version,
+# sehingga setiap migrasi hanya dijalankan sekali per file database.
+# Versi 0 adalah schema awal yang dibuat Database._init.
+import sqlite3
+
+
+def _transaksi_item_primary_key(conn):
+    """
+    Membangun ulang transaksi_item dengan PRIMARY KEY (transaksi_id, produk_id).
+
+    Tabel dibuat WITHOUT ROWID sehingga baris tersimpan terurut menurut
+    transaksi_id; index transaksi_item(transaksi_id) dari migrasi 1 jadi
+    redundan dan dihapus. Baris duplikat (jika ada) digabung: qty
+    dijumlahkan dan harga menjadi rata-rata tertimbang qty, sehingga
+    subtotal qty * harga (pendapatan historis) tetap sama.
+    """
+    conn.execute("""
+    CREATE TABLE transaksi_item_baru(
+        transaksi_id INTEGER,
+        produk_id INTEGER,
+        qty INTEGER,
+        harga REAL,
+        PRIMARY KEY (transaksi_id, produk_id)
+    ) WITHOUT ROWID""")
+    conn.execute("""
+    INSERT INTO transaksi_item_baru
+    SELECT transaksi_id, produk_id, SUM(qty),
+           CASE WHEN SUM(qty) = 0 THEN MAX(harga) ELSE SUM(qty * harga) / SUM(qty) END
+    FROM transaksi_item
+    GROUP BY transaksi_id, produk_id""")
+    conn.execute("DROP TABLE transaksi_item")
+    conn.execute("ALTER TABLE transaksi_item_baru RENAME TO transaksi_item")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transaksi_item_produk ON transaksi_item(produk_id)")
+
+
+def _produk_fts(conn):
+    """
+    Index full-text FTS5 untuk produk.nama (external content: teks tidak
+    disimpan dua kali) yang disinkronkan lewat trigger. Trigger update
+    hanya aktif jika nama berubah, jadi update stok saat checkout tidak
+    menyentuh index.
+
+    Jika SQLite tidak dikompilasi dengan FTS5, migrasi dilewati dan
+    ProdukRepository.search memakai LIKE sebagai fallback.
+    """
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE produk_fts USING fts5(nama, content='produk', content_rowid='id')"
+        )
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            return
+        raise
+    conn.execute("""
+    CREATE TRIGGER produk_fts_ai AFTER INSERT ON produk BEGIN
+        INSERT INTO produk_fts(rowid, nama) VALUES (new.id, new.nama);
+    END""")
+    conn.execute("""
+    CREATE TRIGGER produk_fts_ad AFTER DELETE ON produk BEGIN
+        INSERT INTO produk_fts(produk_fts, rowid, nama) VALUES ('delete', old.id, old.nama);
+    END""")
+    conn.execute("""
+    CREATE TRIGGER produk_fts_au AFTER UPDATE OF nama ON produk
+    WHEN old.nama IS NOT new.nama BEGIN
+        INSERT INTO produk_fts(produk_fts, rowid, nama) VALUES ('delete', old.id, old.nama);
+        INSERT INTO produk_fts(rowid, nama) VALUES (new.id, new.nama);
+    END""")
+    conn.execute("INSERT INTO produk_fts(produk_fts) VALUES ('rebuild')")
+
+
+# Membangun ulang tabel ringkasan dari transaksi/transaksi_item. Dipakai
+# migrasi 6 dan TransaksiRepository.rebuildRingkasan. Transaksi tanpa
+# created_at (sebelum migrasi 5) tidak masuk ringkasan harian.
+SQL_REBUILD_RINGKASAN = [
+    "DELETE FROM ringkasan_harian",
+    "DELETE FROM ringkasan_produk",
+    "DELETE FROM ringkasan_pembayaran",
+    """
+    INSERT INTO ringkasan_harian(tanggal, jumlah_transaksi, pendapatan, unit)
+    SELECT date(t.created_at), COUNT(*), SUM(t.total),
+           SUM((SELECT COALESCE(SUM(qty), 0) FROM transaksi_item WHERE transaksi_id = t.id))
+    FROM transaksi t
+    WHERE t.created_at IS NOT NULL
+    GROUP BY date(t.created_at)""",
+    """
+    INSERT INTO ringkasan_produk(produk_id, unit, pendapatan)
+    SELECT produk_id, SUM(qty), SUM(qty * harga)
+    FROM transaksi_item
+    GROUP BY produk_id""",
+    """
+    INSERT INTO ringkasan_pembayaran(metode, jumlah_transaksi, pendapatan)
+    SELECT COALESCE(metode, 'tidak diketahui'), COUNT(*), SUM(total)
+    FROM transaksi
+    GROUP BY COALESCE(metode, 'tidak diketahui')""",
+]
+
+
+# (versi, deskripsi, daftar SQL atau fungsi yang menerima koneksi)
+MIGRASI = [
+    (1, "Index untuk lookup transaksi, detail transaksi, dan role user", [
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_user ON transaksi(user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_item_transaksi ON transaksi_item(transaksi_id)",
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_item_produk ON transaksi_item(produk_id)",
+        "CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)",
+    ]),
+    (2, "Primary key komposit transaksi_item(transaksi_id, produk_id)", [
+        _transaksi_item_primary_key,
+    ]),
+    (3, "Index full-text FTS5 untuk nama produk", [
+        _produk_fts,
+    ]),
+    # Tanpa index stok: filter stok minimal jarang selektif, sedangkan
+    # index-nya harus di-update di setiap checkout.
+    (4, "Index untuk filter dan urutan produk (harga, nama)", [
+        "CREATE INDEX IF NOT EXISTS idx_produk_harga ON produk(harga)",
+        "CREATE INDEX IF NOT EXISTS idx_produk_nama ON produk(nama COLLATE NOCASE)",
+    ]),
+    # ALTER TABLE tidak mengizinkan default CURRENT_TIMESTAMP, jadi nilai
+    # diisi TransaksiRepository.save; transaksi lama bernilai NULL.
+    (5, "Waktu transaksi (created_at, UTC) untuk export per tanggal", [
+        "ALTER TABLE transaksi ADD COLUMN created_at TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_created_at ON transaksi(created_at)",
+    ]),
+    (6, "Metode pembayaran transaksi dan tabel ringkasan penjualan", [
+        "ALTER TABLE transaksi ADD COLUMN metode TEXT",
+        """
+        CREATE TABLE ringkasan_harian(
+            tanggal TEXT PRIMARY KEY,
+            jumlah_transaksi INTEGER,
+            pendapatan REAL,
+            unit INTEGER
+        )""",
+        """
+        CREATE TABLE ringkasan_produk(
+            produk_id INTEGER PRIMARY KEY,
+            unit INTEGER,
+            pendapatan REAL
+        )""",
+        """
+        CREATE TABLE ringkasan_pembayaran(
+            metode TEXT PRIMARY KEY,
+            jumlah_transaksi INTEGER,
+            pendapatan REAL
+        )""",
+    ] + SQL_REBUILD_RINGKASAN),
+]
+
+
+def versi_schema(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def jalankan_migrasi(conn):
+    """
+    Menjalankan migrasi yang belum diterapkan, berurutan menurut versi.
+    Harus dipanggil di dalam transaksi agar migrasi gagal tidak setengah jalan.
+    Mengembalikan daftar versi yang baru diterapkan.
+    """
+    sekarang = versi_schema(conn)
+    diterapkan = []
+    for versi, _, langkah in sorted(MIGRASI, key=lambda m: m[0]):
+        if versi <= sekarang:
+            continue
+        for step in langkah:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+        conn.execute(f"PRAGMA user_version={versi}")
+        diterapkan.append(versi)
+    return diterapkan
@@ -0,0 +1,119 @@
+# Repository/profiler.py
+import logging
+import re
+import sqlite3
+import sys
+import threading
+
+from Utils.metrics import LatencyWindow
+
+log = logging.getLogger("ecommerce.sql")
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_ANGKA = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_DAFTAR = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_RE_SPASI = re.compile(r"\s+")
+
+
+def normalisasi_sql(sql):
+    """
+    Bentuk baku teks SQL untuk pengelompokan: spasi dirapikan, literal
+    string/angka diganti '?', dan daftar IN (?,?,...) dengan panjang
+    berbeda disatukan menjadi IN (...).
+    """
+    sql = _RE_STRING.sub("?", sql)
+    sql = _RE_ANGKA.sub("?", sql)
+    sql = _RE_SPASI.sub(" ", sql).strip()
+    return _RE_DAFTAR.sub("IN (...)", sql)
+
+
+class _StatQuery:
+    def __init__(self, window):
+        self.latency = LatencyWindow(window)
+        self.rows = 0
+        self.slow = 0
+
+
+class QueryProfiler:
+    """
+    Statistik query per SQL yang dinormalisasi: jumlah panggilan, total
+    dan persentil latensi, serta jumlah baris (baris yang dibaca untuk
+    SELECT, baris yang terpengaruh untuk INSERT/UPDATE/DELETE).
+
+    Query yang lebih lambat dari `slow_ms` ditulis ke logger
+    "ecommerce.sql" (WARNING) bersama EXPLAIN QUERY PLAN-nya.
+    Dipasang lewat Database.enable_profiler().
+    """
+    def __init__(self, slow_ms=100.0, explain=True, window=10000):
+        self._slow = slow_ms / 1000
+        self._explain = explain
+        self._window = window
+        self._data = {}
+        self._cache_normal = {}
+        self._lock = threading.Lock()
+
+    def catat(self, conn, sql, params, detik, rows):
+        kunci = self._cache_normal.get(sql)
+        if kunci is None:
+            if len(self._cache_normal) > 10000:
+                self._cache_normal.clear()
+            kunci = self._cache_normal[sql] = normalisasi_sql(sql)
+        stat = self._data.get(kunci)
+        if stat is None:
+            with self._lock:
+                stat = self._data.setdefault(kunci, _StatQuery(self._window))
+        stat.latency.add(detik)
+        with self._lock:
+            stat.rows += max(rows, 0)
+        if detik >= self._slow:
+            with self._lock:
+                stat.slow += 1
+            self._log_lambat(conn, sql, params, kunci, detik, rows)
+
+    def _log_lambat(self, conn, sql, params, kunci, detik, rows):
+        pesan = f"query lambat {detik * 1000:.1f} ms, {rows} baris: {kunci}"
+        if self._explain and params is not None:
+            try:
+                plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            except sqlite3.Error:
+                plan = []
+            for _, parent, _, detail in plan:
+                pesan += f"\n    {'  ' if parent else ''}{detail}"
+        log.warning(pesan)
+
+    def stats(self):
+        """
+        List dict per query (sql, count, total_ms, avg/p50/p95/p99/max_ms,
+        rows, slow), terurut menurut total waktu terbesar.
+        """
+        with self._lock:
+            data = list(self._data.items())
+        hasil = []
+        for sql, stat in data:
+            ringkas = stat.latency.ringkas()
+            ringkas["total_ms"] = stat.latency.total * 1000
+            ringkas["rows"] = stat.rows
+            ringkas["slow"] = stat.slow
+            ringkas["sql"] = sql
+            hasil.append(ringkas)
+        return sorted(hasil, key=lambda r: r["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+    def dump(self, file=None, limit=20, lebar_sql=70):
+        """Menulis tabel ringkasan (query termahal dulu) ke file/stderr."""
+        file = file or sys.stderr
+        print(
+            f"{'total ms':>10} {'count':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'rows':>10} {'slow':>5}  sql",
+            file=file
+        )
+        for r in self.stats()[:limit]:
+            sql = r["sql"] if len(r["sql"]) <= lebar_sql else r["sql"][:lebar_sql - 3] + "..."
+            print(
+                f"{r['total_ms']:>10.1f} {r['count']:>8} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                f"{r['p99_ms']:>8.2f} {r['rows']:>10} {r['slow']:>5}  {sql}",
+                file=file
+            )
@@ -1,89 +1,808 @@
 # Repository/repository.py
-import hashlib
+import atexit
+import queue
+import re
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 
-from Models.models import Produk, Transaksi
-from Exceptions.exceptions import TransaksiTidakDitemukanError
+from Models.models import Produk, ProdukBatch, Transaksi
+from Repository.cache import LRUCache
+from Repository.profiler import QueryProfiler
+from Utils.metrics import tracer
+from Utils.password import hash_password
+from Repository.migrations import SQL_REBUILD_RINGKASAN, jalankan_migrasi, versi_schema
+from Exceptions.exceptions import DatabaseError, PoolKoneksiHabisError, StokTidakCukupError, TransaksiTidakDitemukanError
+
+
+class ConnectionPool:
+    """
+    Pool koneksi SQLite yang aman dipakai banyak thread.
+
+    Koneksi dibuat secara lazy sampai batas `size`. Jika semua koneksi
+    sedang dipakai, pemanggil menunggu paling lama `timeout` detik
+    sebelum PoolKoneksiHabisError dilempar.
+    """
+    def __init__(self, factory, size=5, timeout=5.0):
+        if size < 1:
+            raise ValueError("Ukuran pool minimal 1")
+        self._factory = factory
+        self._size = size
+        self._timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all = []
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._acquired = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+
+    def acquire(self):
+        """
+        Meminjam satu koneksi dari pool.
+        """
+        with self._lock:
+            self._acquired += 1
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                if len(self._all) < self._size:
+                    conn = self._factory()
+                    self._all.append(conn)
+            if conn is not None:
+                self._mark_in_use()
+                return conn
+            self._waits += 1
+
+        # Semua koneksi sedang dipakai: tunggu sampai ada yang dikembalikan
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self._timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+                self._wait_time += time.perf_counter() - start
+            raise PoolKoneksiHabisError(
+                f"Tidak ada koneksi tersedia dalam {self._timeout} detik "
+                f"(pool size {self._size})"
+            )
+        with self._lock:
+            self._wait_time += time.perf_counter() - start
+            self._mark_in_use()
+        return conn
+
+    def _mark_in_use(self):
+        self._in_use += 1
+        self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+    def release(self, conn):
+        """
+        Mengembalikan koneksi ke pool.
+        """
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(conn)
+
+    def stats(self):
+        """
+        Statistik pemakaian pool (untuk memantau saturasi).
+        """
+        with self._lock:
+            return {
+                "size": self._size,
+                "created": len(self._all),
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total": self._wait_time,
+            }
+
+    def close(self):
+        """
+        Menutup semua koneksi yang pernah dibuat pool.
+        """
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+
+
+# Kode error primer SQLite yang berarti database tidak bisa dipakai lagi:
+# SQLITE_IOERR, SQLITE_CORRUPT, SQLITE_FULL, SQLITE_CANTOPEN, SQLITE_NOTADB
+_KODE_ERROR_FATAL = {10, 11, 13, 14, 26}
+
+
+def _error_fatal(error):
+    kode = getattr(error, "sqlite_errorcode", None)
+    return kode is not None and kode & 0xFF in _KODE_ERROR_FATAL
+
+
+class _GroupSlot:
+    """Satu unit kerja yang menunggu dieksekusi oleh GroupCommit."""
+    def __init__(self, fn):
+        self.fn = fn
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class GroupCommit:
+    """
+    Menggabungkan unit kerja dari banyak thread ke satu transaksi SQLite.
+
+    Satu thread flusher mengumpulkan unit kerja selama `window` detik
+    (atau sampai `max_batch` unit), lalu menjalankan semuanya di satu
+    transaksi dengan savepoint per unit: unit yang melempar exception
+    (misal StokTidakCukupError, ValueError, atau IntegrityError) hanya
+    membatalkan dirinya sendiri. Error I/O atau database korup, transaksi
+    luar yang hilang, dan commit yang gagal membatalkan seluruh batch.
+    Setiap pemanggil tetap menerima hasil atau error-nya sendiri.
+    """
+    def __init__(self, db, window=0.002, max_batch=32):
+        self._db = db
+        self._window = window
+        self._max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending = []
+        self._stop = False
+        self._batches = 0
+        self._units = 0
+        self._thread = threading.Thread(target=self._flusher, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def run(self, fn):
+        """Menjalankan fn() di batch berikutnya dan menunggu hasilnya."""
+        slot = _GroupSlot(fn)
+        with self._cond:
+            if self._stop:
+                raise DatabaseError("Group commit sudah dihentikan")
+            self._pending.append(slot)
+            self._cond.notify_all()
+        slot.done.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _ambil_batch(self):
+        with self._cond:
+            while not self._pending and not self._stop:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            # Tunggu unit lain sampai window habis atau batch penuh
+            batas = time.perf_counter() + self._window
+            while len(self._pending) < self._max_batch and not self._stop:
+                sisa = batas - time.perf_counter()
+                if sisa <= 0:
+                    break
+                self._cond.wait(sisa)
+            batch = self._pending[:self._max_batch]
+            del self._pending[:self._max_batch]
+            return batch
+
+    def _flusher(self):
+        while True:
+            batch = self._ambil_batch()
+            if batch is None:
+                return
+            try:
+                self._jalankan_batch(batch)
+            finally:
+                self._batches += 1
+                self._units += len(batch)
+                for slot in batch:
+                    slot.done.set()
+
+    def _jalankan_batch(self, batch):
+        try:
+            with self._db.transaction() as conn:
+                for slot in batch:
+                    try:
+                        with self._db.savepoint():
+                            slot.result = slot.fn()
+                    except sqlite3.Error as e:
+                        # Savepoint sudah membatalkan unit ini (misal UNIQUE
+                        # gagal); batch hanya dibatalkan jika transaksi luar
+                        # hilang atau database rusak/tidak bisa ditulis
+                        if not conn.in_transaction or _error_fatal(e):
+                            raise
+                        slot.error = e
+                    except Exception as e:
+                        slot.error = e
+        except BaseException as e:
+            for slot in batch:
+                slot.result, slot.error = None, e
+            if not isinstance(e, Exception):
+                # Flusher berhenti: unit yang masih antri langsung diberi error
+                self._hentikan(e)
+                raise
+
+    def _hentikan(self, sebab):
+        with self._cond:
+            self._stop = True
+            sisa, self._pending = self._pending, []
+        for slot in sisa:
+            slot.error = DatabaseError(f"Group commit berhenti: {sebab!r}")
+            slot.done.set()
+
+    def stats(self):
+        return {
+            "window": self._window,
+            "max_batch": self._max_batch,
+            "batches": self._batches,
+            "units": self._units,
+            "avg_batch": self._units / self._batches if self._batches else 0.0,
+        }
+
+    def close(self):
+        """Menjalankan unit yang tersisa lalu menghentikan flusher."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+# Profil performa storage yang diterapkan setiap kali koneksi dibuka.
+# busy_timeout diletakkan pertama agar PRAGMA berikutnya menunggu lock.
+# - durable   : default SQLite (rollback journal, synchronous=FULL)
+# - balanced  : WAL + synchronous=NORMAL, pembaca tidak memblokir penulis
+# - throughput: WAL + synchronous=OFF, commit tidak menunggu fsync
+#               (data transaksi terakhir bisa hilang jika OS/listrik mati)
+PROFIL_STORAGE = {
+    "durable": {
+        "busy_timeout": 5000,
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "temp_store": "DEFAULT",
+    },
+    "balanced": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -16000,
+        "temp_store": "MEMORY",
+    },
+    "throughput": {
+        "busy_timeout": 10000,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+    },
+}
 
 
 class Database:
     """
     Mengelola koneksi dan eksekusi database SQLite.
+
+    Secara default hanya memakai satu koneksi (pool_size=1). Dengan
+    pool_size > 1 setiap thread meminjam koneksinya sendiri dari pool,
+    sehingga repository bisa dipakai bersamaan dari banyak worker.
+
+    `profile` memilih salah satu PROFIL_STORAGE (default "durable").
     """
-    def __init__(self, name="ecommerce.db"):
-        self._conn = sqlite3.connect(name)
-        self._cursor = self._conn.cursor()
+    def __init__(self, name="ecommerce.db", pool_size=1, pool_timeout=5.0, profile="durable"):
+        if pool_size > 1 and name == ":memory:":
+            raise DatabaseError("Mode pool membutuhkan file database, bukan ':memory:'")
+        if profile not in PROFIL_STORAGE:
+            raise ValueError(
+                f"Profil '{profile}' tidak dikenal, pilih salah satu: {', '.join(PROFIL_STORAGE)}"
+            )
+        self._name = name
+        self._profile = profile
+        self._local = threading.local()
+        self._pool = ConnectionPool(self._connect, pool_size, pool_timeout)
+        self._stats_lock = threading.Lock()
+        self._commits = 0
+        self._rollbacks = 0
+        self._group = None
+        self._profiler = None
         self._init()
 
+    def _connect(self):
+        """
+        Membuka koneksi baru (dipanggil oleh pool).
+
+        isolation_level=None: transaksi dikontrol eksplisit lewat
+        transaction(); di luar itu setiap statement auto-commit.
+        """
+        conn = sqlite3.connect(self._name, check_same_thread=False, isolation_level=None)
+        for pragma, value in PROFIL_STORAGE[self._profile].items():
+            conn.execute(f"PRAGMA {pragma}={value}")
+        return conn
+
+    @property
+    def profile(self):
+        return self._profile
+
+    def storage_info(self):
+        """
+        Nilai PRAGMA yang benar-benar aktif di koneksi (bukan sekadar
+        yang diminta profil, misal database ':memory:' tidak bisa WAL).
+        """
+        info = {"profile": self._profile}
+        with self.connection() as conn:
+            for pragma in PROFIL_STORAGE[self._profile]:
+                info[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        return info
+
+    @contextmanager
+    def connection(self):
+        """
+        Meminjam koneksi untuk thread saat ini.
+
+        Pemanggilan bersarang di thread yang sama memakai koneksi yang
+        sama, jadi koneksi baru dikembalikan ke pool di level terluar.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        with tracer.span("db.acquire"):
+            conn = self._pool.acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._pool.release(conn)
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        """
+        Unit of work: semua query di dalam blok memakai koneksi yang sama
+        dan di-commit sekali di akhir (rollback jika terjadi error).
+
+        Blok bersarang ikut transaksi terluar. immediate=True langsung
+        mengambil write lock (BEGIN IMMEDIATE) agar tidak gagal saat
+        upgrade lock di tengah transaksi.
+        """
+        with self.connection() as conn:
+            if getattr(self._local, "tx_depth", 0):
+                self._local.tx_depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._local.tx_depth -= 1
+                return
+
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            self._local.tx_depth = 1
+            self._local.after_commit = []
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                self._count(rollbacks=1)
+                raise
+            else:
+                try:
+                    with tracer.span("db.commit"):
+                        if self._profiler is None:
+                            conn.commit()
+                        else:
+                            mulai = time.perf_counter()
+                            conn.commit()
+                            self._profiler.catat(conn, "COMMIT", None, time.perf_counter() - mulai, 0)
+                except BaseException:
+                    # COMMIT gagal (misal "database is locked"): transaksi
+                    # masih terbuka, jadi harus di-rollback sebelum koneksi
+                    # kembali ke pool
+                    conn.rollback()
+                    self._count(rollbacks=1)
+                    raise
+                self._count(commits=1)
+                for fn in self._local.after_commit:
+                    fn()
+            finally:
+                self._local.tx_depth = 0
+                self._local.after_commit = []
+
+    def on_commit(self, fn):
+        """
+        Menjadwalkan fn setelah transaksi terluar di thread ini commit
+        (langsung dijalankan jika tidak sedang dalam transaksi).
+        """
+        if self.in_transaction():
+            self._local.after_commit.append(fn)
+        else:
+            fn()
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Savepoint di dalam transaksi: jika blok gagal, hanya perubahan di
+        dalam blok yang dibatalkan, transaksi luar tetap berjalan.
+        """
+        with self.transaction() as conn:
+            depth = getattr(self._local, "sp_depth", 0)
+            name = f"sp_{depth}"
+            conn.execute(f"SAVEPOINT {name}")
+            self._local.sp_depth = depth + 1
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {name}")
+                raise
+            finally:
+                conn.execute(f"RELEASE {name}")
+                self._local.sp_depth = depth
+
+    def in_transaction(self):
+        """True jika thread saat ini sedang berada di dalam transaction()."""
+        return getattr(self._local, "tx_depth", 0) > 0
+
+    def _count(self, commits=0, rollbacks=0):
+        with self._stats_lock:
+            self._commits += commits
+            self._rollbacks += rollbacks
+
+    def commit_stats(self):
+        """Jumlah commit/rollback (tiap commit = fsync pada mode durable)."""
+        with self._stats_lock:
+            return {"commits": self._commits, "rollbacks": self._rollbacks}
+
+    def enable_group_commit(self, window=0.002, max_batch=32):
+        """
+        Mengaktifkan group commit: unit kerja yang masuk lewat run_grouped()
+        dari banyak thread digabung ke satu transaksi per window.
+        """
+        if self._group is not None:
+            self._group.close()
+        self._group = GroupCommit(self, window, max_batch)
+
+    def run_grouped(self, fn):
+        """
+        Menjalankan fn() lewat group commit jika aktif. Jika tidak aktif,
+        atau thread ini sudah berada di dalam transaksi (menunggu flusher
+        akan deadlock karena write lock dipegang thread ini), fn()
+        langsung dijalankan.
+        """
+        if self._group is None or self.in_transaction():
+            return fn()
+        return self._group.run(fn)
+
+    def group_commit_stats(self):
+        return self._group.stats() if self._group is not None else None
+
+    def enable_profiler(self, slow_ms=100.0, explain=True, dump_on_exit=False):
+        """
+        Mengaktifkan QueryProfiler: statistik per query untuk execute,
+        execute_count, executemany, iterate, fetchone, fetchall, dan
+        COMMIT, plus log query yang lebih lambat dari slow_ms.
+        dump_on_exit=True mencetak ringkasan saat proses selesai.
+        Saat tidak aktif, biaya per query hanya satu pengecekan None.
+        """
+        self._profiler = QueryProfiler(slow_ms, explain)
+        if dump_on_exit:
+            atexit.register(self._profiler.dump)
+        return self._profiler
+
+    def disable_profiler(self):
+        self._profiler = None
+
+    @property
+    def profiler(self):
+        """QueryProfiler yang aktif, atau None."""
+        return self._profiler
+
+    def pool_stats(self):
+        """Statistik saturasi pool koneksi."""
+        return self._pool.stats()
+
+    def close(self):
+        """Menutup semua koneksi database."""
+        if self._group is not None:
+            self._group.close()
+            self._group = None
+        self._pool.close()
+
     def _init(self):
         """
-        Inisialisasi tabel dan akun admin default.
-        """
-        self._cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            password TEXT,
-            role TEXT
-        )""")
-
-        self._cursor.execute("""
-        CREATE TABLE IF NOT EXISTS produk(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nama TEXT,
-            harga REAL,
-            stok INTEGER
-        )""")
-
-        self._cursor.execute("""
-        CREATE TABLE IF NOT EXISTS transaksi(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            total REAL,
-            status TEXT
-        )""")
-
-        self._cursor.execute("""
-        CREATE TABLE IF NOT EXISTS transaksi_item(
-            transaksi_id INTEGER,
-            produk_id INTEGER,
-            qty INTEGER,
-            harga REAL
-        )""")
-        
-        # Membuat admin default jika belum ada
-        self._cursor.execute("SELECT * FROM users WHERE role='admin'")
-        if not self._cursor.fetchone():
-            pw = hashlib.sha256("admin123".encode()).hexdigest()
-            self._cursor.execute(
-                "INSERT INTO users (username, password, role) VALUES (?,?,?)",
-                ("admin", pw, "admin")
-            )
-        self._conn.commit()
+        Inisialisasi tabel, migrasi schema, dan akun admin default.
+        """
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE,
+                password TEXT,
+                role TEXT
+            )""")
+
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS produk(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nama TEXT,
+                harga REAL,
+                stok INTEGER
+            )""")
+
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS transaksi(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                total REAL,
+                status TEXT
+            )""")
+
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS transaksi_item(
+                transaksi_id INTEGER,
+                produk_id INTEGER,
+                qty INTEGER,
+                harga REAL
+            )""")
+
+            # Membuat admin default jika belum ada
+            cursor.execute("SELECT * FROM users WHERE role='admin'")
+            if not cursor.fetchone():
+                pw = hash_password("admin123")
+                cursor.execute(
+                    "INSERT INTO users (username, password, role) VALUES (?,?,?)",
+                    ("admin", pw, "admin")
+                )
+
+            jalankan_migrasi(conn)
+
+    def schema_version(self):
+        """Versi schema (PRAGMA user_version) setelah migrasi."""
+        with self.connection() as conn:
+            return versi_schema(conn)
 
     def execute(self, q, p=()):
-        """Menjalankan query INSERT/UPDATE/DELETE."""
-        self._cursor.execute(q, p)
-        self._conn.commit()
+        """
+        Menjalankan query INSERT/UPDATE/DELETE.
+        Mengembalikan rowid terakhir (berguna untuk INSERT).
+
+        Di luar transaction() query langsung di-commit (auto-commit).
+        """
+        with self.connection() as conn:
+            cursor = self._jalankan(conn, q, p)
+            if not conn.in_transaction:
+                self._count(commits=1)
+            return cursor.lastrowid
+
+    def execute_count(self, q, p=()):
+        """
+        Menjalankan query UPDATE/DELETE.
+        Mengembalikan jumlah baris yang terpengaruh.
+        """
+        with self.connection() as conn:
+            cursor = self._jalankan(conn, q, p)
+            if not conn.in_transaction:
+                self._count(commits=1)
+            return cursor.rowcount
+
+    def executemany(self, q, seq):
+        """
+        Menjalankan satu query untuk banyak baris parameter sekaligus.
+        Mengembalikan total baris yang terpengaruh.
+        """
+        with self.connection() as conn:
+            if self._profiler is None:
+                cursor = conn.executemany(q, seq)
+            else:
+                mulai = time.perf_counter()
+                cursor = conn.executemany(q, seq)
+                self._profiler.catat(conn, q, None, time.perf_counter() - mulai, cursor.rowcount)
+            if not conn.in_transaction:
+                self._count(commits=1)
+            return cursor.rowcount
+
+    def iterate(self, q, p=(), size=1000):
+        """
+        Generator baris hasil query, diambil per `size` baris dengan
+        fetchmany, sehingga hasil besar tidak pernah dimuat sekaligus.
+        Koneksi dipinjam selama generator belum habis/ditutup.
+        """
+        with self.connection() as conn:
+            profiler = self._profiler
+            if profiler is None:
+                cursor = conn.execute(q, p)
+                try:
+                    while True:
+                        rows = cursor.fetchmany(size)
+                        if not rows:
+                            return
+                        yield from rows
+                finally:
+                    cursor.close()
+
+            # Yang dicatat hanya waktu execute + fetchmany, bukan waktu
+            # pemanggil memproses baris di antara chunk
+            detik = 0.0
+            jumlah = 0
+            mulai = time.perf_counter()
+            cursor = conn.execute(q, p)
+            try:
+                while True:
+                    rows = cursor.fetchmany(size)
+                    detik += time.perf_counter() - mulai
+                    if not rows:
+                        return
+                    jumlah += len(rows)
+                    yield from rows
+                    mulai = time.perf_counter()
+            finally:
+                cursor.close()
+                profiler.catat(conn, q, p, detik, jumlah)
+
+    def _jalankan(self, conn, q, p):
+        if self._profiler is None:
+            return conn.execute(q, p)
+        mulai = time.perf_counter()
+        cursor = conn.execute(q, p)
+        self._profiler.catat(conn, q, p, time.perf_counter() - mulai, cursor.rowcount)
+        return cursor
 
     def fetchone(self, q, p=()):
         """Mengambil satu data."""
-        self._cursor.execute(q, p)
-        return self._cursor.fetchone()
+        with self.connection() as conn:
+            if self._profiler is None:
+                return conn.execute(q, p).fetchone()
+            mulai = time.perf_counter()
+            row = conn.execute(q, p).fetchone()
+            self._profiler.catat(conn, q, p, time.perf_counter() - mulai, 1 if row else 0)
+            return row
 
     def fetchall(self, q, p=()):
         """Mengambil banyak data."""
-        self._cursor.execute(q, p)
-        return self._cursor.fetchall()
+        with self.connection() as conn:
+            if self._profiler is None:
+                return conn.execute(q, p).fetchall()
+            mulai = time.perf_counter()
+            rows = conn.execute(q, p).fetchall()
+            self._profiler.catat(conn, q, p, time.perf_counter() - mulai, len(rows))
+            return rows
 
 
-class UserRepository:
+class ProdukQuery:
     """
-    Repository khusus tabel users.
+    Filter dan urutan produk yang bisa dirangkai, lalu dikompilasi menjadi
+    satu query SQL berparameter (lihat ProdukRepository.find).
+
+        q = ProdukQuery().harga_antara(maks=100000).stok_minimal(1).urutkan("harga")
+        halaman1 = repo.find(q.batasi(20))
+        halaman2 = repo.find(q.batasi(20).setelah(halaman1[-1]))
+
+    Setiap method mengembalikan objek baru, jadi query dasar bisa dipakai
+    ulang. Urutan selalu diakhiri id agar cursor (setelah) stabil.
+    """
+    # Kolom urutan -> ekspresi SQL (nama memakai NOCASE sesuai index)
+    SORT_KEYS = {
+        "id": "id",
+        "nama": "nama COLLATE NOCASE",
+        "harga": "harga",
+        "stok": "stok",
+    }
+
+    def __init__(self):
+        self._harga_min = None
+        self._harga_max = None
+        self._stok_min = None
+        self._prefix = None
+        self._sort = "id"
+        self._desc = False
+        self._limit = None
+        self._offset = 0
+        self._cursor = None
+
+    def _salin(self, **ubah):
+        q = ProdukQuery.__new__(ProdukQuery)
+        q.__dict__.update(self.__dict__)
+        for k, v in ubah.items():
+            setattr(q, "_" + k, v)
+        return q
+
+    def harga_antara(self, minimal=None, maks=None):
+        return self._salin(harga_min=minimal, harga_max=maks)
+
+    def stok_minimal(self, n):
+        return self._salin(stok_min=n)
+
+    def nama_diawali(self, prefix):
+        return self._salin(prefix=prefix or None)
+
+    def urutkan(self, key="id", desc=False):
+        if key not in self.SORT_KEYS:
+            raise ValueError(f"Urutan '{key}' tidak dikenal, pilih salah satu: {', '.join(self.SORT_KEYS)}")
+        return self._salin(sort=key, desc=desc, cursor=None)
+
+    def batasi(self, limit, offset=0):
+        return self._salin(limit=limit, offset=offset)
+
+    def setelah(self, produk: Produk):
+        """
+        Cursor keyset: lanjutkan setelah produk terakhir halaman sebelumnya.
+        Lebih murah daripada offset besar karena langsung lompat lewat index.
+        """
+        return self._salin(cursor=(getattr(produk, self._sort), produk.id), offset=0)
+
+    def compile(self):
+        """Mengembalikan (sql, params)."""
+        where, params = [], []
+        if self._harga_min is not None:
+            where.append("harga >= ?")
+            params.append(self._harga_min)
+        if self._harga_max is not None:
+            where.append("harga <= ?")
+            params.append(self._harga_max)
+        if self._stok_min is not None:
+            where.append("stok >= ?")
+            params.append(self._stok_min)
+        if self._prefix is not None:
+            # Range pada index nama, setara LIKE 'prefix%' tanpa case
+            where.append("nama >= ? COLLATE NOCASE AND nama < ? COLLATE NOCASE")
+            params += [self._prefix, self._prefix + "\U0010ffff"]
+
+        kolom = self.SORT_KEYS[self._sort]
+        arah = "DESC" if self._desc else "ASC"
+        if self._cursor is not None:
+            if self._sort == "id":
+                where.append("id < ?" if self._desc else "id > ?")
+                params.append(self._cursor[1])
+            else:
+                # Row value saja tidak dipakai planner sebagai batas index;
+                # bound kolom di depannya membuat scan mulai dari cursor
+                where.append(f"{kolom} {'<=' if self._desc else '>='} ?")
+                where.append(f"({kolom}, id) {'<' if self._desc else '>'} (?, ?)")
+                params += [self._cursor[0], *self._cursor]
+
+        sql = "SELECT * FROM produk"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {kolom} {arah}"
+        if self._sort != "id":
+            sql += f", id {arah}"
+        if self._limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [self._limit, self._offset]
+        return sql, params
+
+
+class BaseRepository:
+    """
+    Kelas dasar repository: menyimpan referensi Database dan membuka
+    transaksi yang ikut dipakai semua repository di thread yang sama.
     """
     def __init__(self, db: Database):
         self._db = db
 
+    def transaction(self):
+        return self._db.transaction()
+
+    def savepoint(self):
+        return self._db.savepoint()
+
+    def grouped(self, fn):
+        return self._db.run_grouped(fn)
+
+
+class UserRepository(BaseRepository):
+    """
+    Repository khusus tabel users.
+    """
+
     def save(self, username, password, role):
         self._db.execute(
             "INSERT INTO users(username,password,role) VALUES (?,?,?)",
@@ -96,13 +815,14 @@ class UserRepository:
             (username,)
         )
 
+    def updatePassword(self, id, password):
+        self._db.execute("UPDATE users SET password=? WHERE id=?", (password, id))
 
-class ProdukRepository:
+
+class ProdukRepository(BaseRepository):
     """
     Repository khusus tabel produk.
     """
-    def __init__(self, db: Database):
-        self._db = db
 
     def findAll(self):
         return [Produk(*r) for r in self._db.fetchall("SELECT * FROM produk")]
@@ -111,35 +831,303 @@ class ProdukRepository:
         r = self._db.fetchone("SELECT * FROM produk WHERE id=?", (id,))
         return Produk(*r) if r else None
 
+    def findAllBatch(self, query: ProdukQuery = None):
+        """
+        Seperti findAll/find, tetapi mengembalikan ProdukBatch (kolom
+        array) yang diisi per fetchmany, tanpa membuat objek Produk per
+        baris. Untuk pembacaan massal seperti laporan atau export.
+        """
+        sql, params = query.compile() if query is not None else ("SELECT * FROM produk", ())
+        return ProdukBatch.dari_baris(self._db.iterate(sql, params))
+
+    def findPage(self, after_id=0, limit=50):
+        """
+        Keyset pagination: produk dengan id > after_id, terurut menurut id.
+        Halaman berikutnya dimulai dari id produk terakhir halaman ini,
+        jadi biaya per halaman tetap walau katalog besar.
+        """
+        return [
+            Produk(*r) for r in self._db.fetchall(
+                "SELECT * FROM produk WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit)
+            )
+        ]
+
+    def find(self, query: ProdukQuery):
+        """
+        Menjalankan ProdukQuery (filter, urutan, limit/cursor) sebagai
+        satu query SQL.
+        """
+        sql, params = query.compile()
+        return [Produk(*r) for r in self._db.fetchall(sql, params)]
+
+    def iterAll(self, chunk_size=500):
+        """
+        Generator seluruh produk per chunk (per halaman keyset), tanpa
+        memuat seluruh tabel ke memori atau menahan koneksi antar chunk.
+        """
+        after_id = 0
+        while True:
+            page = self.findPage(after_id, chunk_size)
+            yield from page
+            if len(page) < chunk_size:
+                return
+            after_id = page[-1].id
+
+    def search(self, query, limit=20, prefix=True, ranked=True):
+        """
+        Pencarian produk berdasarkan nama, diurutkan menurut relevansi
+        (bm25). Setiap kata harus cocok; dengan prefix=True setiap kata
+        cukup cocok di awal ("sep" menemukan "Sepatu").
+
+        Ranking harus menilai semua produk yang cocok, jadi untuk kata
+        yang sangat umum ranked=False (urutan index) jauh lebih cepat.
+        """
+        kata = re.findall(r"\w+", query)
+        if not kata:
+            return []
+
+        if not self._punya_fts():
+            pola = "%" + "%".join(kata) + "%"
+            return [
+                Produk(*r) for r in self._db.fetchall(
+                    "SELECT * FROM produk WHERE nama LIKE ? ORDER BY id LIMIT ?",
+                    (pola, limit)
+                )
+            ]
+
+        # Setiap kata di-quote agar karakter khusus FTS tidak diinterpretasi
+        match = " ".join(f'"{k}"' + ("*" if prefix else "") for k in kata)
+        order = "ORDER BY produk_fts.rank" if ranked else ""
+        return [
+            Produk(*r) for r in self._db.fetchall(
+                f"""
+                SELECT p.id, p.nama, p.harga, p.stok
+                FROM produk_fts JOIN produk p ON p.id = produk_fts.rowid
+                WHERE produk_fts MATCH ?
+                {order}
+                LIMIT ?
+                """,
+                (match, limit)
+            )
+        ]
+
+    def _punya_fts(self):
+        if not hasattr(self, "_fts"):
+            self._fts = self._db.fetchone(
+                "SELECT 1 FROM sqlite_master WHERE name='produk_fts'"
+            ) is not None
+        return self._fts
+
+    # Batas aman jumlah parameter per query (SQLite lama: 999)
+    BATCH_SIZE = 500
+
+    def findByIds(self, ids):
+        """
+        Mengambil banyak produk sekaligus dengan query IN (...).
+        Mengembalikan dict id -> Produk; id yang tidak ada tidak disertakan.
+        """
+        ids = list(dict.fromkeys(ids))
+        hasil = {}
+        for i in range(0, len(ids), self.BATCH_SIZE):
+            chunk = ids[i:i + self.BATCH_SIZE]
+            placeholder = ",".join("?" * len(chunk))
+            for r in self._db.fetchall(f"SELECT * FROM produk WHERE id IN ({placeholder})", chunk):
+                hasil[r[0]] = Produk(*r)
+        return hasil
+
     def save(self, nama, harga, stok):
         self._db.execute(
             "INSERT INTO produk(nama,harga,stok) VALUES (?,?,?)",
             (nama, harga, stok)
         )
 
+    def upsertBanyak(self, rows):
+        """
+        Insert atau update banyak produk sekaligus lewat executemany.
+        rows: iterable (id, nama, harga, stok); id None berarti produk baru,
+        id yang sudah ada akan di-update.
+        """
+        return self._db.executemany(
+            """
+            INSERT INTO produk(id,nama,harga,stok) VALUES (?,?,?,?)
+            ON CONFLICT(id) DO UPDATE SET
+                nama=excluded.nama, harga=excluded.harga, stok=excluded.stok
+            """,
+            rows
+        )
+
     def update(self, produk: Produk):
         self._db.execute(
             "UPDATE produk SET nama=?,harga=?,stok=? WHERE id=?",
             (produk.nama, produk.harga, produk.stok, produk.id)
         )
 
+    def kurangiStok(self, id, qty):
+        """
+        Mengurangi stok secara atomik, hanya jika stok masih cukup.
+        Cek dan update terjadi di satu statement, jadi dua checkout
+        bersamaan tidak bisa sama-sama lolos lalu saling menimpa.
+        Mengembalikan True jika berhasil.
+        """
+        return self._db.execute_count(
+            "UPDATE produk SET stok = stok - ? WHERE id=? AND stok >= ?",
+            (qty, id, qty)
+        ) == 1
+
+    def kurangiStokBanyak(self, items):
+        """
+        Mengurangi stok banyak produk (dict produk_id -> qty) dalam satu
+        transaksi. Mengembalikan daftar produk_id yang gagal (stok tidak
+        cukup atau produk tidak ada); baris lain tetap dikurangi, jadi
+        pemanggil yang memutuskan rollback dengan melempar error di dalam
+        transaction() miliknya.
+
+        Jalur cepat memakai satu executemany. Jika ada baris yang gagal,
+        batch dibatalkan lewat savepoint lalu diulang per baris untuk
+        mengetahui produk mana yang gagal.
+        """
+        rows = [(qty, pid, qty) for pid, qty in items.items()]
+        with self.transaction():
+            try:
+                with self._db.savepoint():
+                    if self._db.executemany(
+                        "UPDATE produk SET stok = stok - ? WHERE id=? AND stok >= ?", rows
+                    ) != len(rows):
+                        raise StokTidakCukupError("Sebagian stok tidak cukup")
+                return []
+            except StokTidakCukupError:
+                return [pid for pid, qty in items.items() if not self.kurangiStok(pid, qty)]
+
     def delete(self, id):
         self._db.execute("DELETE FROM produk WHERE id=?", (id,))
 
 
-class TransaksiRepository:
+class CachedProdukRepository(ProdukRepository):
+    """
+    ProdukRepository dengan cache in-process (LRU + TTL) per id dan untuk
+    snapshot seluruh katalog.
+
+    Setiap penulisan lewat repository ini (save/update/delete/kurangiStok)
+    langsung menghapus entri terkait, dan sekali lagi setelah transaksi
+    commit. Pembacaan yang dimulai sebelum commit bisa selesai setelah
+    invalidasi kedua; karena itu hasil bacaan hanya disimpan jika generasi
+    cache tidak berubah selama query (LRUCache.generasi), sehingga data
+    lama tidak tertinggal sampai TTL habis. Penulisan langsung ke database
+    di luar repository ini hanya terlihat setelah TTL habis.
+    """
+    def __init__(self, db: Database, maxsize=4096, ttl=30.0):
+        super().__init__(db)
+        self._cache = LRUCache(maxsize, ttl)
+
+    # Cache menyimpan tuple baris, bukan objek Produk, karena Produk bisa
+    # diubah pemanggil (misal menu update admin) sebelum disimpan.
+    def findAll(self):
+        rows = self._cache.get(("all",))
+        if rows is None:
+            generasi = self._cache.generasi()
+            rows = self._db.fetchall("SELECT * FROM produk")
+            self._cache.set(("all",), rows, generasi)
+        return [Produk(*r) for r in rows]
+
+    def findAllBatch(self, query: ProdukQuery = None):
+        if query is not None:
+            return super().findAllBatch(query)
+        rows = self._cache.get(("all",))
+        if rows is None:
+            return super().findAllBatch()
+        return ProdukBatch.dari_baris(rows)
+
+    def findById(self, id):
+        r = self._cache.get(("id", id))
+        if r is None:
+            generasi = self._cache.generasi()
+            r = self._db.fetchone("SELECT * FROM produk WHERE id=?", (id,))
+            if r:
+                self._cache.set(("id", id), r, generasi)
+        return Produk(*r) if r else None
+
+    def findByIds(self, ids):
+        hasil = {}
+        kosong = []
+        for id in dict.fromkeys(ids):
+            r = self._cache.get(("id", id))
+            if r is None:
+                kosong.append(id)
+            else:
+                hasil[id] = Produk(*r)
+        if kosong:
+            generasi = self._cache.generasi()
+            for id, produk in super().findByIds(kosong).items():
+                self._cache.set(("id", id), (produk.id, produk.nama, produk.harga, produk.stok), generasi)
+                hasil[id] = produk
+        return hasil
+
+    def save(self, nama, harga, stok):
+        super().save(nama, harga, stok)
+        self._invalidate()
+
+    def upsertBanyak(self, rows):
+        jumlah = super().upsertBanyak(rows)
+        self._invalidate_semua()
+        return jumlah
+
+    def update(self, produk: Produk):
+        super().update(produk)
+        self._invalidate([produk.id])
+
+    def delete(self, id):
+        super().delete(id)
+        self._invalidate([id])
+
+    def kurangiStok(self, id, qty):
+        berhasil = super().kurangiStok(id, qty)
+        self._invalidate([id])
+        return berhasil
+
+    def kurangiStokBanyak(self, items):
+        gagal = super().kurangiStokBanyak(items)
+        self._invalidate(items.keys())
+        return gagal
+
+    def _invalidate(self, ids=()):
+        ids = list(ids)
+
+        def hapus():
+            self._cache.delete(("all",))
+            for id in ids:
+                self._cache.delete(("id", id))
+
+        hapus()
+        self._db.on_commit(hapus)
+
+    def _invalidate_semua(self):
+        self._cache.clear()
+        self._db.on_commit(self._cache.clear)
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def cache_stats(self):
+        """Counter hit/miss/eviction cache produk."""
+        return self._cache.stats()
+
+
+class TransaksiRepository(BaseRepository):
     """
     Repository khusus transaksi dan detail transaksi.
     """
-    def __init__(self, db: Database):
-        self._db = db
 
     def save(self, transaksi: Transaksi):
-        self._db.execute(
-            "INSERT INTO transaksi(user_id,total,status) VALUES (?,?,?)",
-            (transaksi.user_id, transaksi.total, transaksi.status)
+        # rowid diambil dari cursor yang sama; "SELECT last_insert_rowid()"
+        # tidak aman di mode pool karena bisa jatuh ke koneksi lain
+        return self._db.execute(
+            "INSERT INTO transaksi(user_id,total,status,metode,created_at) VALUES (?,?,?,?,datetime('now'))",
+            (transaksi.user_id, transaksi.total, transaksi.status, transaksi.metode)
         )
-        return self._db.fetchone("SELECT last_insert_rowid()")[0]
+
+    def updateStatus(self, id, status):
+        self._db.execute("UPDATE transaksi SET status=? WHERE id=?", (status, id))
 
     def saveItem(self, transaksi_id, produk_id, qty, harga):
         self._db.execute(
@@ -147,6 +1135,146 @@ class TransaksiRepository:
             (transaksi_id, produk_id, qty, harga)
         )
 
+    def saveItems(self, transaksi_id, rows):
+        """
+        Menyimpan banyak detail transaksi sekaligus lewat executemany.
+        rows: iterable (produk_id, qty, harga).
+        """
+        self._db.executemany(
+            "INSERT INTO transaksi_item VALUES (?,?,?,?)",
+            [(transaksi_id, pid, qty, harga) for pid, qty, harga in rows]
+        )
+
+    def tambahRingkasan(self, transaksi_id, rows):
+        """
+        Menambahkan satu transaksi ke tabel ringkasan (harian, per produk,
+        per metode pembayaran). Dipanggil di transaksi yang sama dengan
+        penyimpanan transaksi, jadi ringkasan ikut di-rollback jika gagal.
+        rows: iterable (produk_id, qty, harga).
+        """
+        rows = list(rows)
+        unit = sum(qty for _, qty, _ in rows)
+        self._db.execute(
+            """
+            INSERT INTO ringkasan_harian(tanggal, jumlah_transaksi, pendapatan, unit)
+            SELECT date(created_at), 1, total, ? FROM transaksi WHERE id=?
+            ON CONFLICT(tanggal) DO UPDATE SET
+                jumlah_transaksi = jumlah_transaksi + 1,
+                pendapatan = pendapatan + excluded.pendapatan,
+                unit = unit + excluded.unit
+            """,
+            (unit, transaksi_id)
+        )
+        self._db.execute(
+            """
+            INSERT INTO ringkasan_pembayaran(metode, jumlah_transaksi, pendapatan)
+            SELECT COALESCE(metode, 'tidak diketahui'), 1, total FROM transaksi WHERE id=?
+            ON CONFLICT(metode) DO UPDATE SET
+                jumlah_transaksi = jumlah_transaksi + 1,
+                pendapatan = pendapatan + excluded.pendapatan
+            """,
+            (transaksi_id,)
+        )
+        self._db.executemany(
+            """
+            INSERT INTO ringkasan_produk(produk_id, unit, pendapatan) VALUES (?,?,?)
+            ON CONFLICT(produk_id) DO UPDATE SET
+                unit = unit + excluded.unit,
+                pendapatan = pendapatan + excluded.pendapatan
+            """,
+            [(pid, qty, qty * harga) for pid, qty, harga in rows]
+        )
+
+    def rebuildRingkasan(self):
+        """
+        Membangun ulang semua tabel ringkasan dari data transaksi.
+        """
+        with self.transaction():
+            for sql in SQL_REBUILD_RINGKASAN:
+                self._db.execute(sql)
+
+    def ringkasanHarian(self, dari=None, sampai=None):
+        """
+        Pendapatan per hari (tanggal, jumlah_transaksi, pendapatan, unit)
+        dengan tanggal di rentang [dari, sampai].
+        """
+        return self._db.fetchall(
+            """
+            SELECT tanggal, jumlah_transaksi, pendapatan, unit FROM ringkasan_harian
+            WHERE tanggal >= COALESCE(?, '') AND tanggal <= COALESCE(?, '9999-12-31')
+            ORDER BY tanggal
+            """,
+            (dari, sampai)
+        )
+
+    def ringkasanProduk(self, limit=10, urut="pendapatan"):
+        """
+        Produk terlaris (produk_id, nama, unit, pendapatan), diurutkan
+        menurut pendapatan atau unit.
+        """
+        if urut not in ("pendapatan", "unit"):
+            raise ValueError("urut harus 'pendapatan' atau 'unit'")
+        return self._db.fetchall(
+            f"""
+            SELECT r.produk_id, p.nama, r.unit, r.pendapatan
+            FROM ringkasan_produk r LEFT JOIN produk p ON p.id = r.produk_id
+            ORDER BY r.{urut} DESC LIMIT ?
+            """,
+            (limit,)
+        )
+
+    def ringkasanPembayaran(self):
+        """Jumlah transaksi dan pendapatan per metode pembayaran."""
+        return self._db.fetchall(
+            "SELECT metode, jumlah_transaksi, pendapatan FROM ringkasan_pembayaran ORDER BY pendapatan DESC"
+        )
+
+    # Kolom hasil iterExport (juga dipakai sebagai header export)
+    KOLOM_EXPORT = (
+        "transaksi_id", "user_id", "created_at", "status", "total",
+        "produk_id", "nama_produk", "qty", "harga", "subtotal",
+    )
+
+    def iterExport(self, dari=None, sampai=None, id_min=None, id_max=None, batch=1000):
+        """
+        Generator baris transaksi + detail item (lihat KOLOM_EXPORT),
+        terurut menurut id transaksi. Filter opsional: rentang created_at
+        [dari, sampai) dan rentang id [id_min, id_max].
+
+        Dengan filter tanggal, urutannya (created_at, id) agar mengikuti
+        idx_transaksi_created_at; ORDER BY t.id di rentang tanggal memaksa
+        SQLite menyortir seluruh rentang di temp B-tree sebelum baris
+        pertama keluar, sehingga memori ikut membesar.
+        """
+        where, params = [], []
+        if dari is not None:
+            where.append("t.created_at >= ?")
+            params.append(dari)
+        if sampai is not None:
+            where.append("t.created_at < ?")
+            params.append(sampai)
+        if id_min is not None:
+            where.append("t.id >= ?")
+            params.append(id_min)
+        if id_max is not None:
+            where.append("t.id <= ?")
+            params.append(id_max)
+
+        sql = """
+            SELECT t.id, t.user_id, t.created_at, t.status, t.total,
+                   ti.produk_id, p.nama, ti.qty, ti.harga, ti.qty * ti.harga
+            FROM transaksi t
+            JOIN transaksi_item ti ON ti.transaksi_id = t.id
+            LEFT JOIN produk p ON p.id = ti.produk_id
+        """
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if dari is not None or sampai is not None:
+            sql += " ORDER BY t.created_at, t.id, ti.produk_id"
+        else:
+            sql += " ORDER BY t.id, ti.produk_id"
+        return self._db.iterate(sql, params, batch)
+
     def findByUser(self, user_id):
         return self._db.fetchall(
             "SELECT * FROM transaksi WHERE user_id=?",
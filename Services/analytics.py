@@ -0,0 +1,139 @@
+# Services/analytics.py
+#
+# Analitik transaksi berbasis NumPy. NumPy adalah dependency opsional:
+# modul ini tetap bisa di-import tanpa NumPy, tetapi AnalitikTransaksi
+# akan melempar ImportError saat dibuat.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from Repository.repository import Database
+
+
+_DTYPE_ITEM = [("transaksi_id", "i8"), ("produk_id", "i8"), ("qty", "i8"), ("harga", "f8")]
+_DTYPE_TRANSAKSI = [("id", "i8"), ("user_id", "i8"), ("total", "f8"), ("created_at", "M8[s]")]
+
+
+def _muat_kolom(db, sql, dtype, batch):
+    """
+    Membaca hasil query per batch (fetchmany) dan mengubah setiap batch
+    menjadi array terstruktur; batch digabung sekali di akhir.
+    """
+    potongan = []
+    chunk = []
+    for row in db.iterate(sql, (), batch):
+        chunk.append(row)
+        if len(chunk) >= batch:
+            potongan.append(np.array(chunk, dtype=dtype))
+            chunk = []
+    if chunk or not potongan:
+        potongan.append(np.array(chunk, dtype=dtype))
+    return np.concatenate(potongan)
+
+
+def group_sum(keys, values):
+    """
+    Jumlah `values` per nilai unik `keys`.
+    Mengembalikan (keys_unik, jumlah), keys_unik terurut naik.
+    """
+    unik, idx = np.unique(keys, return_inverse=True)
+    return unik, np.bincount(idx, weights=values, minlength=len(unik))
+
+
+def top_k(keys, values, k):
+    """
+    k pasangan (key, value) dengan value terbesar, terurut menurun.
+    Memakai argpartition (O(n)) lalu hanya mengurutkan k teratas.
+    """
+    k = min(k, len(values))
+    if k == 0:
+        return keys[:0], values[:0]
+    idx = np.argpartition(values, -k)[-k:]
+    idx = idx[np.argsort(values[idx])[::-1]]
+    return keys[idx], values[idx]
+
+
+class AnalitikTransaksi:
+    """
+    Memuat transaksi_item (transaksi_id, produk_id, qty, harga) dan
+    transaksi (id, user_id, total, created_at) ke array NumPy kolom,
+    lalu menyediakan agregasi tervektorisasi di atasnya.
+    """
+    def __init__(self, item, transaksi):
+        if np is None:
+            raise ImportError("AnalitikTransaksi membutuhkan NumPy (pip install numpy)")
+        self.item = item
+        self.transaksi = transaksi
+
+    @classmethod
+    def muat(cls, db: Database, batch=100000):
+        if np is None:
+            raise ImportError("AnalitikTransaksi membutuhkan NumPy (pip install numpy)")
+        item = _muat_kolom(
+            db, "SELECT transaksi_id, produk_id, qty, harga FROM transaksi_item", _DTYPE_ITEM, batch
+        )
+        transaksi = _muat_kolom(
+            db, "SELECT id, user_id, total, created_at FROM transaksi", _DTYPE_TRANSAKSI, batch
+        )
+        return cls(item, transaksi)
+
+    def _pendapatan_baris(self):
+        return self.item["qty"] * self.item["harga"]
+
+    def pendapatanPerProduk(self):
+        """(produk_id, pendapatan) untuk setiap produk yang pernah terjual."""
+        return group_sum(self.item["produk_id"], self._pendapatan_baris())
+
+    def unitPerProduk(self):
+        """(produk_id, unit terjual)."""
+        ids, unit = group_sum(self.item["produk_id"], self.item["qty"])
+        return ids, unit.astype(np.int64)
+
+    def produkTerlaris(self, k=10, menurut="pendapatan"):
+        """k produk teratas menurut pendapatan atau unit: (produk_id, nilai)."""
+        ids, nilai = self.pendapatanPerProduk() if menurut == "pendapatan" else self.unitPerProduk()
+        return top_k(ids, nilai, k)
+
+    def pendapatanHarian(self):
+        """(tanggal datetime64[D], pendapatan); transaksi tanpa tanggal diabaikan."""
+        ada = ~np.isnat(self.transaksi["created_at"])
+        tanggal = self.transaksi["created_at"][ada].astype("M8[D]")
+        return group_sum(tanggal, self.transaksi["total"][ada])
+
+    def ukuranKeranjang(self, menurut="unit"):
+        """
+        Ukuran keranjang per transaksi: total unit (menurut="unit") atau
+        jumlah baris produk (menurut="baris"). Mengembalikan (transaksi_id, ukuran).
+        """
+        nilai = self.item["qty"] if menurut == "unit" else np.ones(len(self.item))
+        ids, ukuran = group_sum(self.item["transaksi_id"], nilai)
+        return ids, ukuran.astype(np.int64)
+
+    def persentilUkuranKeranjang(self, persen=(50, 90, 95, 99), menurut="unit"):
+        """
+        Persentil distribusi ukuran keranjang, dict persen -> nilai.
+        Metode nearest-rank, sama dengan Utils.metrics.persentil.
+        """
+        _, ukuran = self.ukuranKeranjang(menurut)
+        if len(ukuran) == 0:
+            return {p: 0.0 for p in persen}
+        urut = np.sort(ukuran)
+        idx = np.minimum(len(urut) - 1, (np.asarray(persen) / 100 * len(urut)).astype(np.int64))
+        return dict(zip(persen, urut[idx].tolist()))
+
+    def elastisitasHarga(self, produk_id):
+        """
+        Estimasi elastisitas harga satu produk: kemiringan regresi
+        log(qty) terhadap log(harga) di semua baris penjualannya.
+        Mengembalikan None jika harga produk tidak pernah berubah.
+        """
+        pilih = self.item["produk_id"] == produk_id
+        harga = self.item["harga"][pilih]
+        qty = self.item["qty"][pilih]
+        valid = (harga > 0) & (qty > 0)
+        harga, qty = harga[valid], qty[valid]
+        if len(np.unique(harga)) < 2:
+            return None
+        slope, _ = np.polyfit(np.log(harga), np.log(qty), 1)
+        return float(slope)
@@ -0,0 +1,120 @@
+# Services/async_services.py
+import asyncio
+import functools
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from Models.models import Keranjang, Produk
+from Repository.repository import ProdukRepository, TransaksiRepository, UserRepository
+from Services.services import STATUS_GAGAL_BAYAR, AuthService, CheckoutService, Payment, ProdukService
+from Utils.metrics import tracer
+
+log = logging.getLogger("ecommerce.payment")
+
+
+class AsyncServiceBase:
+    """
+    Kelas dasar service async.
+
+    Pekerjaan repository (SQLite, blocking) dijalankan di executor thread
+    yang ukurannya dibatasi, sehingga event loop tetap bebas melayani
+    sesi lain. Sebaiknya ukuran executor tidak melebihi pool_size Database
+    agar worker tidak saling menunggu koneksi.
+    """
+    def __init__(self, executor=None, max_workers=4):
+        self._executor = executor or ThreadPoolExecutor(max_workers, thread_name_prefix="repo")
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+
+class AsyncAuthService(AsyncServiceBase):
+    """
+    Versi async AuthService (aturan dan exception yang sama).
+    """
+    def __init__(self, userRepo: UserRepository, executor=None, max_workers=4, hasher=None):
+        super().__init__(executor, max_workers)
+        self._service = AuthService(userRepo, hasher)
+
+    async def register(self, username, password, role):
+        return await self._run(self._service.register, username, password, role)
+
+    async def login(self, username, password):
+        return await self._run(self._service.login, username, password)
+
+
+class AsyncProdukService(AsyncServiceBase):
+    """
+    Versi async ProdukService (aturan dan exception yang sama).
+    """
+    def __init__(self, repo: ProdukRepository, executor=None, max_workers=4):
+        super().__init__(executor, max_workers)
+        self._service = ProdukService(repo)
+
+    async def tambahProduk(self, nama, harga, stok):
+        return await self._run(self._service.tambahProduk, nama, harga, stok)
+
+    async def updateProduk(self, produk: Produk):
+        return await self._run(self._service.updateProduk, produk)
+
+    async def hapusProduk(self, id):
+        return await self._run(self._service.hapusProduk, id)
+
+    async def cariProduk(self, query, limit=20):
+        return await self._run(self._service.cariProduk, query, limit)
+
+
+class AsyncCheckoutService(AsyncServiceBase):
+    """
+    Versi async CheckoutService.
+
+    Validasi dan penyimpanan memakai CheckoutService yang sama (termasuk
+    StokTidakCukupError dan ProdukTidakDitemukanError), begitu juga urutan
+    pembayaran: otorisasi, simpan, lalu capture, atau batal jika simpan
+    gagal. Setiap tahap pembayaran di-await: versi *_async milik payment
+    (misal GatewayPayment) atau method yang berupa coroutine langsung
+    di-await, selain itu dijalankan di executor agar tidak memblokir
+    event loop.
+    """
+    def __init__(self, trxRepo: TransaksiRepository, produkRepo: ProdukRepository,
+                 executor=None, max_workers=4):
+        super().__init__(executor, max_workers)
+        self._service = CheckoutService(trxRepo, produkRepo)
+        self._trxRepo = trxRepo
+
+    async def _payment(self, payment, tahap, arg):
+        fn = getattr(payment, f"{tahap}_async", None) or getattr(payment, tahap)
+        if inspect.iscoroutinefunction(fn):
+            return await fn(arg)
+        hasil = await self._run(fn, arg)
+        # capture() bawaan Payment memanggil bayar(), yang bisa berupa coroutine
+        if inspect.isawaitable(hasil):
+            hasil = await hasil
+        return hasil
+
+    async def checkout(self, user_id, keranjang: Keranjang, payment: Payment):
+        with tracer.span("checkout.validasi"):
+            items, produk_map, total = await self._run(self._service.validasi, keranjang)
+
+        with tracer.span("checkout.bayar"):
+            otorisasi = await self._payment(payment, "otorisasi", total)
+
+        try:
+            with tracer.span("checkout.simpan"):
+                trx_id = await self._run(self._service.simpan, user_id, items, produk_map, total, payment.metode)
+        except BaseException:
+            try:
+                await self._payment(payment, "batal", otorisasi)
+            except Exception:
+                log.exception("Gagal membatalkan otorisasi %s (%s)", otorisasi, payment.metode)
+            raise
+
+        with tracer.span("checkout.capture"):
+            try:
+                await self._payment(payment, "capture", otorisasi)
+            except Exception:
+                await self._run(self._trxRepo.updateStatus, trx_id, STATUS_GAGAL_BAYAR)
+                raise
+        return trx_id
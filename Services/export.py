@@ -0,0 +1,51 @@
+# Services/export.py
+import csv
+import gzip
+import json
+from contextlib import closing
+
+from Repository.repository import TransaksiRepository
+
+
+class TransaksiExporter:
+    """
+    Export transaksi beserta detail item ke CSV atau JSON per baris
+    (NDJSON), satu baris per item.
+
+    Data dibaca lewat TransaksiRepository.iterExport (fetchmany per batch)
+    dan langsung ditulis ke file, jadi pemakaian memori tetap datar
+    berapapun jumlah transaksi. File berakhiran .gz ditulis dengan gzip.
+    """
+    def __init__(self, trxRepo: TransaksiRepository):
+        self._trxRepo = trxRepo
+
+    def export(self, path, format=None, gzip_output=None, **filter):
+        """
+        Menulis export ke `path`. format: "csv" atau "jsonl" (default dari
+        ekstensi file). filter diteruskan ke iterExport (dari, sampai,
+        id_min, id_max, batch). Mengembalikan jumlah baris yang ditulis.
+        """
+        nama = path[:-3] if path.endswith(".gz") else path
+        if gzip_output is None:
+            gzip_output = path.endswith(".gz")
+        format = format or ("csv" if nama.endswith(".csv") else "jsonl")
+        if format not in ("csv", "jsonl"):
+            raise ValueError(f"Format '{format}' tidak didukung")
+
+        rows = self._trxRepo.iterExport(**filter)
+        kolom = TransaksiRepository.KOLOM_EXPORT
+        jumlah = 0
+        opener = gzip.open if gzip_output else open
+        # closing(): koneksi dikembalikan ke pool walau penulisan gagal
+        with closing(rows), opener(path, "wt", newline="", encoding="utf-8") as f:
+            if format == "csv":
+                writer = csv.writer(f)
+                writer.writerow(kolom)
+                for row in rows:
+                    writer.writerow(row)
+                    jumlah += 1
+            else:
+                for row in rows:
+                    f.write(json.dumps(dict(zip(kolom, row))) + "\n")
+                    jumlah += 1
+        return jumlah
@@ -0,0 +1,307 @@
+# Services/gateway.py
+import asyncio
+import itertools
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+from Exceptions.exceptions import PembayaranDitolakError, PembayaranGagalError, PembayaranTimeoutError
+from Services.services import Payment
+from Utils.metrics import LatencyWindow
+
+
+class PaymentGateway(ABC):
+    """
+    Interface payment gateway: authorize, lalu capture atau void, semuanya
+    async.
+
+    idempotency_key dikirim ulang saat retry, sehingga gateway tidak
+    membuat otorisasi ganda jika request sebelumnya sebenarnya sampai.
+    void membatalkan otorisasi yang belum di-capture (dana dilepas).
+    PembayaranDitolakError berarti ditolak permanen (tidak di-retry);
+    PembayaranGagalError lain dianggap sementara.
+    """
+    name = "gateway"
+
+    @abstractmethod
+    async def authorize(self, total, idempotency_key):
+        pass
+
+    @abstractmethod
+    async def capture(self, auth_id):
+        pass
+
+    @abstractmethod
+    async def void(self, auth_id):
+        pass
+
+
+class MockGateway(PaymentGateway):
+    """
+    Gateway lokal untuk load test tanpa jaringan.
+
+    - latency, jitter   : waktu respon (detik) = latency ± jitter
+    - failure_rate      : peluang error sementara (akan di-retry)
+    - decline_rate      : peluang ditolak permanen
+    - hang_rate         : peluang tidak merespon (memicu timeout)
+
+    Status setiap otorisasi ("authorized", "captured", "voided") bisa
+    dibaca lewat status(auth_id).
+    """
+    def __init__(self, name="mock", latency=0.05, jitter=0.02, failure_rate=0.0,
+                 decline_rate=0.0, hang_rate=0.0, seed=None):
+        self.name = name
+        self._latency = latency
+        self._jitter = jitter
+        self._failure_rate = failure_rate
+        self._decline_rate = decline_rate
+        self._hang_rate = hang_rate
+        self._rng = random.Random(seed)
+        self._auth = {}
+        self._status = {}
+        self._ids = itertools.count(1)
+
+    async def _respon(self):
+        if self._rng.random() < self._hang_rate:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(max(0.0, self._rng.uniform(self._latency - self._jitter, self._latency + self._jitter)))
+        if self._rng.random() < self._failure_rate:
+            raise PembayaranGagalError(f"{self.name}: error sementara")
+
+    async def authorize(self, total, idempotency_key):
+        await self._respon()
+        if idempotency_key in self._auth:
+            return self._auth[idempotency_key]
+        if self._rng.random() < self._decline_rate:
+            raise PembayaranDitolakError(f"{self.name}: pembayaran Rp{total} ditolak")
+        auth_id = f"{self.name}-{next(self._ids)}"
+        self._auth[idempotency_key] = auth_id
+        self._status[auth_id] = "authorized"
+        return auth_id
+
+    async def capture(self, auth_id):
+        await self._respon()
+        if self._status.get(auth_id) == "voided":
+            raise PembayaranDitolakError(f"{self.name}: otorisasi {auth_id} sudah dibatalkan")
+        self._status[auth_id] = "captured"
+        return auth_id
+
+    async def void(self, auth_id):
+        await self._respon()
+        if self._status.get(auth_id) == "captured":
+            raise PembayaranDitolakError(f"{self.name}: otorisasi {auth_id} sudah di-capture")
+        self._status[auth_id] = "voided"
+        return auth_id
+
+    def status(self, auth_id):
+        return self._status.get(auth_id)
+
+
+class _Provider:
+    """
+    Event loop latar dan batas konkurensi milik satu PaymentGateway,
+    dipakai bersama semua GatewayPayment yang membungkus gateway itu.
+    """
+    def __init__(self, gateway, max_concurrency):
+        self.name = gateway.name
+        self.max_concurrency = max_concurrency
+        self.pemakai = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # Semaphore dibuat di dalam loop saat panggilan pertama
+        self.sem = None
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def pastikan_loop(self):
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self.loop.run_forever, name=f"gateway-{self.name}", daemon=True
+                )
+                self._thread.start()
+        return self.loop
+
+    def stop(self):
+        with self._lock:
+            if self.loop is not None:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self._thread.join()
+                self.loop.close()
+                self.loop = None
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+class _Metrik:
+    """Counter dan latensi untuk satu tahap (authorize/capture/void)."""
+    def __init__(self):
+        self.calls = 0
+        self.ok = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.latency = LatencyWindow()
+
+    def ringkas(self):
+        data = {
+            "calls": self.calls,
+            "ok": self.ok,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+        }
+        data.update(self.latency.ringkas())
+        return data
+
+
+class GatewayPayment(Payment):
+    """
+    Metode pembayaran lewat PaymentGateway, dengan timeout per panggilan,
+    batas request bersamaan per provider, retry dengan backoff + jitter,
+    dan metrik latensi.
+
+    Checkout memakai dua tahap: otorisasi() sebelum pesanan disimpan,
+    lalu capture() setelah commit, atau batal() (void) jika penyimpanan
+    gagal, jadi dana tidak pernah ditarik untuk pesanan yang tidak ada.
+    bayar() tetap tersedia untuk authorize + capture sekaligus.
+
+    Semua panggilan ke satu gateway berjalan di satu event loop latar
+    yang dibagikan antar GatewayPayment yang membungkus gateway tersebut,
+    jadi batas konkurensi berlaku per provider, baik untuk pemanggil
+    sinkron (misal CheckoutService) maupun async (versi *_async, dipakai
+    AsyncCheckoutService tanpa memblokir event loop pemanggil). Metrik
+    per tahap dicatat per objek.
+    """
+    def __init__(self, gateway: PaymentGateway, timeout=2.0, max_concurrency=10,
+                 retries=2, backoff=0.05, backoff_max=1.0, seed=None):
+        self._gateway = gateway
+        self._timeout = timeout
+        self._max_concurrency = max_concurrency
+        self._retries = retries
+        self._backoff = backoff
+        self._backoff_max = backoff_max
+        self._rng = random.Random(seed)
+        self._metrik = {"authorize": _Metrik(), "capture": _Metrik(), "void": _Metrik()}
+        with _providers_lock:
+            provider = _providers.get(gateway)
+            if provider is None:
+                provider = _providers[gateway] = _Provider(gateway, max_concurrency)
+            elif provider.max_concurrency != max_concurrency:
+                raise ValueError(
+                    f"Gateway '{gateway.name}' sudah dipakai dengan max_concurrency={provider.max_concurrency}"
+                )
+            provider.pemakai += 1
+        self._provider = provider
+
+    @property
+    def metode(self):
+        return f"gateway:{self._gateway.name}"
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._provider.pastikan_loop())
+
+    def bayar(self, total):
+        """Authorize lalu langsung capture (versi sinkron)."""
+        return self._submit(self._bayar(total)).result()
+
+    async def bayar_async(self, total):
+        return await asyncio.wrap_future(self._submit(self._bayar(total)))
+
+    def otorisasi(self, total):
+        """Authorize `total`; mengembalikan auth_id untuk capture()/batal()."""
+        return self._submit(self._tahap("authorize", self._gateway.authorize, total, uuid.uuid4().hex)).result()
+
+    def capture(self, auth_id):
+        return self._submit(self._tahap("capture", self._gateway.capture, auth_id)).result()
+
+    def batal(self, auth_id):
+        return self._submit(self._tahap("void", self._gateway.void, auth_id)).result()
+
+    async def otorisasi_async(self, total):
+        return await asyncio.wrap_future(
+            self._submit(self._tahap("authorize", self._gateway.authorize, total, uuid.uuid4().hex))
+        )
+
+    async def capture_async(self, auth_id):
+        return await asyncio.wrap_future(self._submit(self._tahap("capture", self._gateway.capture, auth_id)))
+
+    async def batal_async(self, auth_id):
+        return await asyncio.wrap_future(self._submit(self._tahap("void", self._gateway.void, auth_id)))
+
+    async def _bayar(self, total):
+        auth_id = await self._tahap("authorize", self._gateway.authorize, total, uuid.uuid4().hex)
+        return await self._tahap("capture", self._gateway.capture, auth_id)
+
+    async def _tahap(self, tahap, fn, *args):
+        provider = self._provider
+        if provider.sem is None:
+            provider.sem = asyncio.Semaphore(provider.max_concurrency)
+        async with provider.sem:
+            provider.in_flight += 1
+            provider.peak_in_flight = max(provider.peak_in_flight, provider.in_flight)
+            try:
+                return await self._panggil(tahap, fn, *args)
+            finally:
+                provider.in_flight -= 1
+
+    async def _panggil(self, tahap, fn, *args):
+        metrik = self._metrik[tahap]
+        for percobaan in range(self._retries + 1):
+            if percobaan:
+                metrik.retries += 1
+                # Exponential backoff dengan full jitter
+                batas = min(self._backoff_max, self._backoff * 2 ** (percobaan - 1))
+                await asyncio.sleep(self._rng.uniform(0, batas))
+
+            metrik.calls += 1
+            mulai = time.perf_counter()
+            try:
+                hasil = await asyncio.wait_for(fn(*args), self._timeout)
+            except asyncio.TimeoutError:
+                metrik.timeouts += 1
+                error = PembayaranTimeoutError(
+                    f"{self._gateway.name}: {tahap} tidak merespon dalam {self._timeout} detik"
+                )
+            except PembayaranDitolakError:
+                metrik.failed += 1
+                raise
+            except PembayaranGagalError as e:
+                metrik.failed += 1
+                error = e
+            else:
+                metrik.ok += 1
+                metrik.latency.add(time.perf_counter() - mulai)
+                return hasil
+        raise error
+
+    def metrics(self):
+        """
+        Ringkasan metrik per tahap (authorize/capture/void) milik objek ini,
+        dan konkurensi provider (dibagikan antar GatewayPayment).
+        """
+        data = {tahap: m.ringkas() for tahap, m in self._metrik.items()}
+        provider = self._provider
+        data["provider"] = self._gateway.name
+        data["in_flight"] = provider.in_flight if provider else 0
+        data["peak_in_flight"] = provider.peak_in_flight if provider else 0
+        data["max_concurrency"] = self._max_concurrency
+        return data
+
+    def close(self):
+        """Melepas provider; event loop latar berhenti saat pemakai terakhir ditutup."""
+        with _providers_lock:
+            provider, self._provider = self._provider, None
+            if provider is None:
+                return
+            provider.pemakai -= 1
+            if provider.pemakai:
+                return
+            del _providers[self._gateway]
+        provider.stop()
@@ -0,0 +1,264 @@
+# Services/pipeline.py
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+import time
+
+from Exceptions.exceptions import AntrianPenuhError
+from Models.models import Keranjang
+from Services.services import CheckoutService, Payment
+from Utils.metrics import LatencyWindow
+
+
+# Tahap yang dilalui setiap pesanan, untuk status tiket dan metrik latensi
+# (paid = pembayaran sudah diotorisasi, capture dilakukan setelah persisted)
+TAHAP = ("queued", "validated", "paid", "persisted")
+
+
+class CheckoutTicket:
+    """
+    Tiket pesanan yang masuk antrian. Pemanggil menunggu hasilnya lewat
+    wait(); waktu setiap tahap dicatat di `waktu`.
+    """
+    def __init__(self, id, user_id, keranjang: Keranjang, payment: Payment):
+        self.id = id
+        self.user_id = user_id
+        self.keranjang = keranjang
+        self.payment = payment
+        self.status = "queued"
+        self.trx_id = None
+        self.error = None
+        self.waktu = {"queued": time.perf_counter()}
+        self._selesai = threading.Event()
+
+    def _tandai(self, status):
+        self.status = status
+        self.waktu[status] = time.perf_counter()
+
+    def _berhasil(self, trx_id):
+        self.trx_id = trx_id
+        self._tandai("persisted")
+        self._selesai.set()
+
+    def _gagal(self, error):
+        self.error = error
+        self.status = "gagal"
+        self.waktu["gagal"] = time.perf_counter()
+        self._selesai.set()
+
+    def done(self):
+        return self._selesai.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Menunggu pesanan selesai. Mengembalikan trx_id atau melempar error
+        checkout aslinya (misal StokTidakCukupError).
+        """
+        if not self._selesai.wait(timeout):
+            raise TimeoutError(f"Tiket {self.id} belum selesai dalam {timeout} detik")
+        if self.error is not None:
+            raise self.error
+        return self.trx_id
+
+
+class CheckoutPipeline:
+    """
+    Antrian pesanan di depan CheckoutService.
+
+    Pemanggil submit() keranjang dan langsung mendapat tiket. Sejumlah
+    worker mengambil pesanan dari antrian, hingga `batch_size` sekaligus:
+    setiap pesanan divalidasi, otorisasi pembayaran satu batch berjalan
+    bersamaan, lalu batch disimpan dalam satu transaksi
+    (CheckoutService.simpanBanyak). Pembayaran pesanan yang tersimpan
+    di-capture bersamaan; otorisasi pesanan yang gagal disimpan dibatalkan.
+    Panggilan pembayaran berjalan di thread pool bersama berukuran
+    `payment_workers` (default workers * batch_size); batas per gateway
+    tetap max_concurrency milik GatewayPayment.
+
+    Antrian dibatasi `max_queue`. Jika penuh, submit() menunggu paling
+    lama `timeout` detik (backpressure; None = tunggu terus, 0 = langsung
+    tolak) lalu melempar AntrianPenuhError.
+    """
+    def __init__(self, service: CheckoutService, workers=4, max_queue=1000, batch_size=16,
+                 payment_workers=None):
+        self._service = service
+        self._jumlah_worker = workers
+        self._batch_size = batch_size
+        self._payment_workers = payment_workers or workers * batch_size
+        self._pembayaran = None
+        self._queue = queue.Queue(max_queue)
+        self._ids = itertools.count(1)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._batched = 0
+        self._batches = LatencyWindow()
+        self._latency = {tahap: LatencyWindow() for tahap in TAHAP + ("total",)}
+
+    def start(self):
+        self._pembayaran = ThreadPoolExecutor(self._payment_workers, thread_name_prefix="checkout-payment")
+        for i in range(self._jumlah_worker):
+            t = threading.Thread(target=self._worker, name=f"checkout-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self):
+        """Berhenti setelah semua pesanan di antrian diproses."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+        if self._pembayaran is not None:
+            self._pembayaran.shutdown()
+            self._pembayaran = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self, user_id, keranjang: Keranjang, payment: Payment, timeout=0):
+        # Salin keranjang: pemanggil boleh langsung mengosongkannya
+        salinan = Keranjang()
+        for pid, qty in keranjang.get_items().items():
+            salinan.tambah(pid, qty)
+
+        ticket = CheckoutTicket(next(self._ids), user_id, salinan, payment)
+        try:
+            if timeout == 0:
+                self._queue.put_nowait(ticket)
+            else:
+                self._queue.put(ticket, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise AntrianPenuhError(f"Antrian checkout penuh ({self._queue.maxsize} pesanan)")
+        with self._lock:
+            self._submitted += 1
+        return ticket
+
+    def _worker(self):
+        berhenti = False
+        while not berhenti:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                return
+            while len(batch) < self._batch_size:
+                try:
+                    ticket = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if ticket is None:
+                    berhenti = True
+                    break
+                batch.append(ticket)
+            self._proses(batch)
+
+    def _proses(self, batch):
+        tervalidasi = []
+        for ticket in batch:
+            self._latency["queued"].add(time.perf_counter() - ticket.waktu["queued"])
+            try:
+                mulai = time.perf_counter()
+                items, produk_map, total = self._service.validasi(ticket.keranjang)
+            except Exception as e:
+                self._selesai(ticket, error=e)
+                continue
+            ticket._tandai("validated")
+            self._latency["validated"].add(ticket.waktu["validated"] - mulai)
+            tervalidasi.append((ticket, (ticket.user_id, items, produk_map, total, ticket.payment.metode)))
+
+        # Hanya otorisasi, semua pesanan batch sekaligus; dana ditarik
+        # setelah pesanan tersimpan
+        futures = [self._pembayaran.submit(self._otorisasi, ticket, pesanan[3])
+                   for ticket, pesanan in tervalidasi]
+        siap = []
+        for (ticket, pesanan), future in zip(tervalidasi, futures):
+            try:
+                otorisasi = future.result()
+            except Exception as e:
+                self._selesai(ticket, error=e)
+                continue
+            siap.append((ticket, otorisasi, pesanan))
+
+        if not siap:
+            return
+
+        mulai = time.perf_counter()
+        try:
+            hasil = self._service.simpanBanyak([p for _, _, p in siap])
+        except Exception as e:
+            # Error di luar aturan bisnis (misal database): seluruh batch
+            # gagal dan semua otorisasinya dibatalkan di bawah
+            hasil = [e] * len(siap)
+        durasi = time.perf_counter() - mulai
+        self._batches.add(durasi)
+        with self._lock:
+            self._batched += len(siap)
+
+        futures = []
+        for (ticket, otorisasi, _), h in zip(siap, hasil):
+            self._latency["persisted"].add(durasi)
+            if isinstance(h, Exception):
+                fn, args = self._service.batalkanPembayaran, (ticket.payment, otorisasi)
+            else:
+                fn, args = self._service.capturePembayaran, (ticket.payment, otorisasi, h)
+            futures.append(self._pembayaran.submit(fn, *args))
+        for (ticket, _, _), h, future in zip(siap, hasil, futures):
+            if isinstance(h, Exception):
+                future.result()
+                self._selesai(ticket, error=h)
+                continue
+            try:
+                future.result()
+            except Exception as e:
+                ticket.trx_id = h
+                self._selesai(ticket, error=e)
+            else:
+                self._selesai(ticket, trx_id=h)
+
+    def _otorisasi(self, ticket, total):
+        otorisasi = ticket.payment.otorisasi(total)
+        ticket._tandai("paid")
+        self._latency["paid"].add(ticket.waktu["paid"] - ticket.waktu["validated"])
+        return otorisasi
+
+    def _selesai(self, ticket, trx_id=None, error=None):
+        if error is None:
+            ticket._berhasil(trx_id)
+        else:
+            ticket._gagal(error)
+        self._latency["total"].add(time.perf_counter() - ticket.waktu["queued"])
+        with self._lock:
+            if error is None:
+                self._completed += 1
+            else:
+                self._failed += 1
+
+    def stats(self):
+        """
+        Kedalaman antrian, counter, dan latensi per tahap:
+        queued (menunggu di antrian), validated, paid, persisted (per
+        batch), serta total dari submit sampai selesai.
+        """
+        with self._lock:
+            data = {
+                "depth": self._queue.qsize(),
+                "max_queue": self._queue.maxsize,
+                "workers": self._jumlah_worker,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+        data["batch"] = self._batches.ringkas()
+        data["batch"]["avg_size"] = self._batched / data["batch"]["count"] if data["batch"]["count"] else 0.0
+        data["latency"] = {tahap: w.ringkas() for tahap, w in self._latency.items()}
+        return data
@@ -1,9 +1,21 @@
 # Services/services.py
 from abc import ABC, abstractmethod
-import hashlib
-from Exceptions.exceptions import LoginGagalError, ProdukTidakDitemukanError, StokTidakCukupError, UsernameSudahAdaError
+import csv
+import json
+import logging
+import math
+import os
+import time
+from Exceptions.exceptions import EcommerceError, LoginGagalError, ProdukTidakDitemukanError, StokTidakCukupError, UsernameSudahAdaError
 from Models.models import Keranjang, Produk, Transaksi
 from Repository.repository import ProdukRepository, TransaksiRepository, UserRepository
+from Utils.metrics import tracer
+from Utils.password import PasswordHasher
+
+log = logging.getLogger("ecommerce.payment")
+
+# Status transaksi yang tersimpan tetapi capture pembayarannya gagal
+STATUS_GAGAL_BAYAR = "gagal_bayar"
 
 
 class AuthService:
@@ -11,9 +23,15 @@ class AuthService:
     Service yang menangani proses autentikasi:
     - Register user
     - Login user
+
+    Hash password dihitung oleh PasswordHasher (KDF bersalt). Default-nya
+    dihitung langsung di thread pemanggil; server dengan banyak login
+    bersamaan bisa memberi PasswordHasher(workers=N) agar KDF berjalan
+    di process pool (pemanggil bertanggung jawab memanggil close()).
     """
-    def __init__(self, userRepo: UserRepository):
+    def __init__(self, userRepo: UserRepository, hasher: PasswordHasher = None):
         self._userRepo = userRepo
+        self._hasher = hasher or PasswordHasher()
 
     def register(self, username, password, role):
         """
@@ -29,8 +47,8 @@ class AuthService:
             raise UsernameSudahAdaError(
                 f"Username '{username}' sudah ada"
             )
-        # Password di-hash
-        hashed = hashlib.sha256(password.encode()).hexdigest()
+        # Password di-hash (KDF bersalt)
+        hashed = self._hasher.hash(password)
 
         # Simpan user baru
         self._userRepo.save(username, hashed, role)
@@ -41,19 +59,31 @@ class AuthService:
 
         Alur:
         1. Cari user berdasarkan username
-        2. Hash password input
-        3. Cocokkan dengan password di database
+        2. Verifikasi password dengan hash di database
+        3. Jika hash masih format lama/biaya lama, ganti dengan hash baru
         """
-        user = self._userRepo.findByUsername(username)
-        if not user:
-            raise LoginGagalError("Username tidak ditemukan")
-        
-        hashed = hashlib.sha256(password.encode()).hexdigest()
+        with tracer.span("login"):
+            with tracer.span("login.cari_user"):
+                user = self._userRepo.findByUsername(username)
+            if not user:
+                tracer.inc("ecommerce_login_total", (("hasil", "gagal"),))
+                raise LoginGagalError("Username tidak ditemukan")
+
+            with tracer.span("login.verifikasi"):
+                cocok = self._hasher.verify(password, user[2])
+
+            if not cocok:
+                tracer.inc("ecommerce_login_total", (("hasil", "gagal"),))
+                raise LoginGagalError("Password salah")
 
-        if user[2] != hashed:
-            raise LoginGagalError("Password salah")
-        
-        return user
+            if self._hasher.perlu_upgrade(user[2]):
+                with tracer.span("login.upgrade_hash"):
+                    hashed = self._hasher.hash(password)
+                    self._userRepo.updatePassword(user[0], hashed)
+                user = (user[0], user[1], hashed, user[3])
+
+            tracer.inc("ecommerce_login_total", (("hasil", "ok"),))
+            return user
 
 
 class ProdukService:
@@ -66,24 +96,182 @@ class ProdukService:
     def tambahProduk(self, nama, harga, stok):
         self._repo.save(nama, harga, stok)
 
+    def importProduk(self, path, format=None, chunk_size=5000, rejects_path=None):
+        """
+        Import katalog produk dari file CSV atau JSONL secara streaming.
+
+        Kolom: nama, harga, stok, dan opsional id (jika ada, produk dengan
+        id tersebut di-update). Setiap baris divalidasi dengan aturan
+        setter Produk; baris yang ditolak ditulis ke `rejects_path` (JSONL
+        berisi nomor baris, error, dan data aslinya). Baris valid
+        di-upsert per chunk, satu transaksi per chunk, jadi memori tetap
+        konstan berapapun ukuran file.
+
+        Mengembalikan ringkasan: jumlah baris, diterima, ditolak, durasi.
+        """
+        format = format or _format_dari_path(path)
+        hasil = {"baris": 0, "diterima": 0, "ditolak": 0}
+        mulai = time.perf_counter()
+        rejects = open(rejects_path, "w", encoding="utf-8") if rejects_path else None
+        chunk = []
+
+        def flush():
+            with self._repo.transaction():
+                self._repo.upsertBanyak(chunk)
+            hasil["diterima"] += len(chunk)
+            chunk.clear()
+
+        try:
+            for no, data in _baca_baris(path, format):
+                hasil["baris"] += 1
+                try:
+                    chunk.append(_validasi_baris_produk(data))
+                except (ValueError, TypeError, KeyError, AttributeError, OverflowError) as e:
+                    hasil["ditolak"] += 1
+                    if rejects:
+                        rejects.write(json.dumps({"baris": no, "error": str(e), "data": data}) + "\n")
+                    continue
+                if len(chunk) >= chunk_size:
+                    flush()
+            if chunk:
+                flush()
+        finally:
+            if rejects:
+                rejects.close()
+
+        hasil["detik"] = time.perf_counter() - mulai
+        hasil["baris_per_detik"] = hasil["baris"] / hasil["detik"] if hasil["detik"] else 0.0
+        return hasil
+
+    def cariProduk(self, query, limit=20):
+        """
+        Mencari produk berdasarkan nama (relevansi tertinggi di atas).
+        """
+        return self._repo.search(query, limit)
+
     def updateProduk(self, produk: Produk):
-        if not self._repo.findById(produk.id):
-            raise ProdukTidakDitemukanError(f"Produk ID {produk.id} tidak ditemukan")
-        self._repo.update(produk)
+        with self._repo.transaction():
+            if not self._repo.findById(produk.id):
+                raise ProdukTidakDitemukanError(f"Produk ID {produk.id} tidak ditemukan")
+            self._repo.update(produk)
 
     def hapusProduk(self, id):
-        if not self._repo.findById(id):
-            raise ProdukTidakDitemukanError(f"Produk ID {id} tidak ditemukan")
-        self._repo.delete(id)
+        with self._repo.transaction():
+            if not self._repo.findById(id):
+                raise ProdukTidakDitemukanError(f"Produk ID {id} tidak ditemukan")
+            self._repo.delete(id)
+
+
+def _format_dari_path(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Format file '{path}' tidak dikenali, gunakan .csv atau .jsonl")
+
+
+def _baca_baris(path, format):
+    """Generator (nomor_baris, dict) dari file CSV/JSONL, satu baris per iterasi."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if format == "csv":
+            # Baris 1 adalah header
+            for no, row in enumerate(csv.DictReader(f), start=2):
+                yield no, row
+        elif format == "jsonl":
+            for no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield no, {"_raw": line.rstrip("\n"), "_error": str(e)}
+        else:
+            raise ValueError(f"Format '{format}' tidak didukung")
+
+
+def _validasi_baris_produk(data):
+    """
+    Memvalidasi satu baris import dengan aturan setter Produk.
+    Mengembalikan tuple (id, nama, harga, stok) untuk upsertBanyak.
+    """
+    if "_error" in data:
+        raise ValueError(f"JSON tidak valid: {data['_error']}")
+    id = data.get("id")
+    id = _bulat_import(id, "Id") if id not in (None, "") else None
+
+    produk = Produk(id, None, 0, 0)
+    produk.nama = str(data["nama"] or "").strip()
+    produk.harga = _harga_import(data["harga"])
+    produk.stok = _bulat_import(data["stok"], "Stok")
+    return produk.id, produk.nama, produk.harga, produk.stok
+
+
+def _harga_import(value):
+    """Harga harus angka berhingga (nan/inf ditolak; SQLite menyimpan NaN sebagai NULL)."""
+    if isinstance(value, bool):
+        raise TypeError(f"Harga harus angka, bukan {value!r}")
+    harga = float(value)
+    if not math.isfinite(harga):
+        raise ValueError(f"Harga harus angka berhingga, bukan {value!r}")
+    return harga
+
+
+def _bulat_import(value, nama):
+    """
+    Bilangan bulat dalam rentang INTEGER SQLite (64-bit); 2.9 atau true
+    ditolak, bukan dibulatkan.
+    """
+    if isinstance(value, bool):
+        raise TypeError(f"{nama} harus bilangan bulat, bukan {value!r}")
+    if isinstance(value, int):
+        angka = value
+    else:
+        try:
+            angka = int(value) if isinstance(value, str) else None
+        except ValueError:
+            angka = None
+        if angka is None:
+            pecahan = float(value)
+            if not pecahan.is_integer():
+                raise ValueError(f"{nama} harus bilangan bulat, bukan {value!r}")
+            angka = int(pecahan)
+    if not -2**63 <= angka < 2**63:
+        raise ValueError(f"{nama} di luar rentang INTEGER 64-bit: {value!r}")
+    return angka
 
 
 class Payment(ABC):
-    """Abstract class untuk metode pembayaran."""
+    """
+    Abstract class untuk metode pembayaran.
+
+    Checkout membayar dalam dua tahap: otorisasi() sebelum pesanan
+    disimpan, capture() setelah pesanan ter-commit, atau batal() jika
+    penyimpanan gagal (misal stok habis). Metode tanpa otorisasi terpisah
+    cukup mengimplementasikan bayar(), yang dipanggil saat capture.
+    """
 
     @abstractmethod
     def bayar(self, total):    
         pass
 
+    def otorisasi(self, total):
+        """Menahan dana; mengembalikan token untuk capture()/batal()."""
+        return total
+
+    def capture(self, otorisasi):
+        """Menarik dana yang sudah diotorisasi."""
+        return self.bayar(otorisasi)
+
+    def batal(self, otorisasi):
+        """Melepas otorisasi yang tidak jadi di-capture."""
+        pass
+
+    @property
+    def metode(self):
+        """Nama metode yang dicatat di transaksi dan ringkasan."""
+        return type(self).__name__
+
 class CreditCard(Payment):
     def bayar(self, total): 
         print(f"CreditCard Rp{total} OK")
@@ -115,36 +303,156 @@ class CheckoutService:
         2. Validasi produk ada
         3. Validasi stok cukup
         4. Hitung total harga
-        5. Proses pembayaran
+        5. Otorisasi pembayaran
         6. Simpan transaksi
         7. Simpan detail transaksi
-        8. Kurangi stok produk
-        """        
+        8. Kurangi stok produk (atomik, gagal = rollback seluruh transaksi)
+        9. Capture pembayaran jika tersimpan, batalkan otorisasi jika gagal
+        """
+        with tracer.span("checkout"):
+            try:
+                # 1–4: Validasi produk dan hitung total
+                with tracer.span("checkout.validasi"):
+                    items, produk_map, total = self.validasi(keranjang)
+
+                # 5: Otorisasi pembayaran (dana belum ditarik)
+                with tracer.span("checkout.bayar"):
+                    otorisasi = payment.otorisasi(total)
+
+                # 6–8: Simpan transaksi, detail, dan stok
+                try:
+                    with tracer.span("checkout.simpan"):
+                        trx_id = self.simpan(user_id, items, produk_map, total, payment.metode)
+                except BaseException:
+                    self.batalkanPembayaran(payment, otorisasi)
+                    raise
+
+                # 9: Capture setelah pesanan ter-commit
+                with tracer.span("checkout.capture"):
+                    self.capturePembayaran(payment, otorisasi, trx_id)
+            except Exception:
+                tracer.inc("ecommerce_checkout_total", (("hasil", "gagal"),))
+                raise
+            tracer.inc("ecommerce_checkout_total", (("hasil", "ok"),))
+            return trx_id
+
+    def capturePembayaran(self, payment: Payment, otorisasi, trx_id):
+        """
+        Capture pembayaran pesanan yang sudah tersimpan. Jika capture tetap
+        gagal (setelah retry gateway), status transaksi diubah menjadi
+        STATUS_GAGAL_BAYAR agar bisa ditagih ulang, lalu error dilempar.
+        """
+        try:
+            payment.capture(otorisasi)
+        except Exception:
+            self._trxRepo.updateStatus(trx_id, STATUS_GAGAL_BAYAR)
+            raise
+
+    def batalkanPembayaran(self, payment: Payment, otorisasi):
+        """
+        Membatalkan otorisasi pesanan yang gagal disimpan. Kegagalan void
+        hanya dicatat ke log (otorisasi akan kedaluwarsa di provider) agar
+        error asli checkout tetap yang dilempar.
+        """
+        try:
+            payment.batal(otorisasi)
+        except Exception:
+            log.exception("Gagal membatalkan otorisasi %s (%s)", otorisasi, payment.metode)
+
+    def validasi(self, keranjang: Keranjang):
+        """
+        Memvalidasi isi keranjang dan menghitung total.
+        Mengembalikan (items, produk_map, total) untuk dipakai simpan().
+        """
         total = 0
+        items = keranjang.get_items()
+        produk_map = self._produkRepo.findByIds(items.keys())
 
-        # 1–3: Validasi produk dan hitung total
-        for pid, qty in keranjang.get_items().items():
-            produk = self._produkRepo.findById(pid)
+        for pid, qty in items.items():
+            produk = produk_map.get(pid)
             if not produk:
                 raise ProdukTidakDitemukanError(f"Produk dengan ID {pid} tidak ditemukan")
             if produk.stok < qty:
                 raise StokTidakCukupError(f"Stok produk '{produk.nama}' tidak cukup")
-            
+
             total += produk.harga * qty
 
-        # 4: Proses pembayaran 
-        payment.bayar(total)
+        return items, produk_map, total
 
-        # 5: Simpan transaksi
-        trx_id = self._trxRepo.save(
-            Transaksi(None, user_id, total, "selesai")
+    def simpan(self, user_id, items, produk_map, total, metode=None):
+        """
+        Menyimpan transaksi, detail, ringkasan penjualan, dan pengurangan
+        stok dalam satu unit of work (satu commit; jika gagal di tengah,
+        semuanya di-rollback). Jika group commit aktif di Database, unit
+        ini digabung dengan checkout lain yang bersamaan ke satu commit.
+        Mengembalikan id transaksi.
+        """
+        return self._trxRepo.grouped(
+            lambda: self._simpan(user_id, items, produk_map, total, metode)
         )
 
-        # 6–7: Simpan detail transaksi & update stok
-        for pid, qty in keranjang.get_items().items():
-            produk = self._produkRepo.findById(pid)
-            self._trxRepo.saveItem(trx_id, pid, qty, produk.harga)
-            produk.kurangi_stok(qty)
-            self._produkRepo.update(produk)
+    def _simpan(self, user_id, items, produk_map, total, metode=None):
+        with self._trxRepo.transaction():
+            with tracer.span("checkout.insert_transaksi"):
+                trx_id = self._trxRepo.save(
+                    Transaksi(None, user_id, total, "selesai", metode)
+                )
+
+            rows = [(pid, qty, produk_map[pid].harga) for pid, qty in items.items()]
+            with tracer.span("checkout.insert_item"):
+                self._trxRepo.saveItems(trx_id, rows)
+            with tracer.span("checkout.ringkasan"):
+                self._trxRepo.tambahRingkasan(trx_id, rows)
+
+            # Pengurangan stok atomik: validasi bisa basi jika ada
+            # checkout lain yang berjalan bersamaan
+            with tracer.span("checkout.update_stok"):
+                gagal = self._produkRepo.kurangiStokBanyak(items)
+            if gagal:
+                raise StokTidakCukupError(
+                    f"Stok produk ID {', '.join(map(str, gagal))} tidak cukup"
+                )
+
+        return trx_id
+
+    def simpanBanyak(self, pesanan):
+        """
+        Menyimpan banyak pesanan hasil validasi() dalam satu transaksi
+        (satu commit). pesanan: list (user_id, items, produk_map, total, metode).
+
+        Setiap pesanan dibungkus savepoint, jadi pesanan yang gagal (misal
+        stok habis) hanya membatalkan dirinya sendiri. Mengembalikan list
+        berisi trx_id atau exception untuk tiap pesanan, sesuai urutan.
+        """
+        hasil = []
+        with self._trxRepo.transaction():
+            for user_id, items, produk_map, total, metode in pesanan:
+                try:
+                    with self._trxRepo.savepoint():
+                        hasil.append(self._simpan(user_id, items, produk_map, total, metode))
+                except EcommerceError as e:
+                    hasil.append(e)
+        return hasil
+
+
+class LaporanService:
+    """
+    Service laporan penjualan. Hanya membaca tabel ringkasan yang
+    di-update saat checkout, jadi biayanya tidak bertambah seiring
+    jumlah transaksi.
+    """
+    def __init__(self, trxRepo: TransaksiRepository):
+        self._trxRepo = trxRepo
+
+    def pendapatanHarian(self, dari=None, sampai=None):
+        return self._trxRepo.ringkasanHarian(dari, sampai)
+
+    def produkTerlaris(self, limit=10, urut="pendapatan"):
+        return self._trxRepo.ringkasanProduk(limit, urut)
+
+    def pendapatanPerMetode(self):
+        return self._trxRepo.ringkasanPembayaran()
 
-        return trx_id
\ No newline at end of file
+    def rebuild(self):
+        """Membangun ulang ringkasan dari seluruh data transaksi."""
+        self._trxRepo.rebuildRingkasan()
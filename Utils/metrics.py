@@ -0,0 +1,296 @@
+# Utils/metrics.py
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def persentil(data, p):
+    """Persentil p (0-100) dari sampel, metode nearest-rank."""
+    if not data:
+        return 0.0
+    urut = sorted(data)
+    return urut[min(len(urut) - 1, int(p / 100 * len(urut)))]
+
+
+class LatencyWindow:
+    """
+    Sampel latensi (detik) dalam jendela terakhir, plus count dan total
+    sejak awal. Aman dipakai banyak thread.
+    """
+    def __init__(self, window=10000):
+        self._data = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        with self._lock:
+            self._data.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def ringkas(self):
+        with self._lock:
+            data = list(self._data)
+            count, total = self.count, self.total
+        return {
+            "count": count,
+            "avg_ms": total / count * 1000 if count else 0.0,
+            "p50_ms": persentil(data, 50) * 1000,
+            "p95_ms": persentil(data, 95) * 1000,
+            "p99_ms": persentil(data, 99) * 1000,
+            "max_ms": max(data, default=0.0) * 1000,
+        }
+
+
+# Batas bucket histogram (detik), cukup rapat di bawah 1 ms untuk hot path
+BUCKET_DEFAULT = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(nilai):
+    return str(nilai).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class _Histogram:
+    __slots__ = ("_buckets", "_lock", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, detik):
+        i = bisect.bisect_left(self._buckets, detik)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += detik
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Registry:
+    """
+    Kumpulan counter dan histogram berlabel, dengan export ke format
+    teks Prometheus. labels: tuple pasangan (nama, nilai).
+    Aman dipakai banyak thread.
+    """
+    def __init__(self, buckets=BUCKET_DEFAULT):
+        self._buckets = tuple(buckets)
+        self._counter = {}
+        self._histogram = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, nama, help):
+        self._help[nama] = help
+
+    def inc(self, nama, labels=(), nilai=1):
+        with self._lock:
+            key = (nama, labels)
+            self._counter[key] = self._counter.get(key, 0) + nilai
+
+    def histogram(self, nama, labels=()):
+        """Histogram untuk (nama, labels); simpan hasilnya untuk hot path."""
+        h = self._histogram.get((nama, labels))
+        if h is None:
+            with self._lock:
+                h = self._histogram.setdefault((nama, labels), _Histogram(self._buckets))
+        return h
+
+    def observe(self, nama, detik, labels=()):
+        self.histogram(nama, labels).observe(detik)
+
+    def ke_prometheus(self):
+        """Semua metrik dalam format teks Prometheus (exposition 0.0.4)."""
+        with self._lock:
+            counter = sorted(self._counter.items())
+            histogram = sorted(self._histogram.items())
+        histogram = [(key, h.snapshot()) for key, h in histogram]
+
+        baris = []
+        sudah = set()
+
+        def header(nama, tipe):
+            if nama not in sudah:
+                sudah.add(nama)
+                if nama in self._help:
+                    baris.append(f"# HELP {nama} {self._help[nama]}")
+                baris.append(f"# TYPE {nama} {tipe}")
+
+        for (nama, labels), nilai in counter:
+            header(nama, "counter")
+            baris.append(f"{nama}{_label(labels)} {nilai}")
+
+        for (nama, labels), (counts, total, count) in histogram:
+            header(nama, "histogram")
+            kumulatif = 0
+            for batas, n in zip(self._buckets + ("+Inf",), counts):
+                kumulatif += n
+                baris.append(f"{nama}_bucket{_label(labels + (('le', batas),))} {kumulatif}")
+            baris.append(f"{nama}_sum{_label(labels)} {total}")
+            baris.append(f"{nama}_count{_label(labels)} {count}")
+        return "\n".join(baris) + "\n"
+
+    def tulis(self, path):
+        """Menulis ke file secara atomik (untuk textfile collector)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.ke_prometheus())
+        os.replace(tmp, path)
+
+
+class _SpanKosong:
+    """Span saat tracing tidak aktif: tidak mencatat apa pun."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_SPAN_KOSONG = _SpanKosong()
+
+
+class _Span:
+    __slots__ = ("_registry", "_histogram", "_labels", "_mulai")
+
+    def __init__(self, registry, histogram, labels):
+        self._registry = registry
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, tipe, *exc):
+        self._histogram.observe(time.perf_counter() - self._mulai)
+        if tipe is not None:
+            self._registry.inc("ecommerce_span_errors_total", self._labels)
+        return False
+
+
+class Tracer:
+    """
+    Timer span untuk hot path service dan repository:
+
+        with tracer.span("checkout.bayar"):
+            payment.bayar(total)
+
+    Durasi masuk histogram ecommerce_span_seconds{span=...}; span yang
+    keluar karena exception juga menambah ecommerce_span_errors_total.
+    Saat tidak aktif, span() mengembalikan objek kosong yang sama dan
+    inc() langsung kembali, jadi biayanya hanya satu pengecekan None.
+    """
+    def __init__(self):
+        # (registry, cache nama span -> (histogram, labels)) atau None,
+        # diganti sekaligus agar cache selalu milik registry yang aktif
+        self._aktif = None
+
+    def enable(self, registry=None):
+        registry = registry or Registry()
+        registry.describe("ecommerce_span_seconds", "Durasi span service/repository (detik)")
+        registry.describe("ecommerce_span_errors_total", "Span yang selesai dengan exception")
+        self._aktif = (registry, {})
+        return registry
+
+    def disable(self):
+        self._aktif = None
+
+    @property
+    def registry(self):
+        return self._aktif[0] if self._aktif is not None else None
+
+    def span(self, nama):
+        aktif = self._aktif
+        if aktif is None:
+            return _SPAN_KOSONG
+        registry, cache = aktif
+        entry = cache.get(nama)
+        if entry is None:
+            labels = (("span", nama),)
+            entry = cache[nama] = (registry.histogram("ecommerce_span_seconds", labels), labels)
+        return _Span(registry, *entry)
+
+    def inc(self, nama, labels=(), nilai=1):
+        aktif = self._aktif
+        if aktif is not None:
+            aktif[0].inc(nama, labels, nilai)
+
+
+# Tracer global yang dipakai service dan repository
+tracer = Tracer()
+
+
+class PrometheusFileExporter:
+    """
+    Menulis registry ke file setiap `interval` detik (dan sekali saat
+    stop), misal untuk textfile collector node_exporter.
+    """
+    def __init__(self, registry: Registry, path, interval=15.0):
+        self._registry = registry
+        self._path = path
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="metrics-file", daemon=True)
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self._interval):
+            self._registry.tulis(self._path)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._registry.tulis(self._path)
+
+
+def serve_prometheus(registry: Registry, port=9464, host="127.0.0.1"):
+    """
+    Endpoint HTTP lokal /metrics untuk di-scrape Prometheus, berjalan di
+    thread latar. Mengembalikan server; hentikan dengan shutdown().
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            isi = registry.ke_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(isi)))
+            self.end_headers()
+            self.wfile.write(isi)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,142 @@
+# Utils/password.py
+#
+# Hash password dengan KDF bersalt (scrypt atau PBKDF2-SHA256 dari
+# hashlib). Format tersimpan:
+#   scrypt$n=16384,r=8,p=1$<salt base64>$<hash base64>
+#   pbkdf2_sha256$600000$<salt base64>$<hash base64>
+# Hash lama (sha256 hex tanpa salt) tetap bisa diverifikasi dan ditandai
+# perlu_upgrade(), supaya AuthService bisa menggantinya saat login.
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+ALGORITMA = ("scrypt", "pbkdf2_sha256")
+
+
+def _b64(data):
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _unb64(teks):
+    return base64.b64decode(teks + "=" * (-len(teks) % 4))
+
+
+def _derive(algoritma, password, salt, params):
+    """Menghitung KDF (dijalankan di proses worker, harus level modul)."""
+    if algoritma == "scrypt":
+        n, r, p = params
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 2**20, dklen=32
+        )
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, params[0], dklen=32)
+
+
+def _encode(algoritma, params, salt, hasil):
+    if algoritma == "scrypt":
+        n, r, p = params
+        return f"scrypt$n={n},r={r},p={p}${_b64(salt)}${_b64(hasil)}"
+    return f"pbkdf2_sha256${params[0]}${_b64(salt)}${_b64(hasil)}"
+
+
+def _decode(encoded):
+    """(algoritma, params, salt, hash) atau ("sha256", (), b"", hex) untuk hash lama."""
+    if "$" not in encoded:
+        return "sha256", (), b"", encoded
+    algoritma, params, salt, hasil = encoded.split("$")
+    if algoritma == "scrypt":
+        nilai = dict(bagian.split("=") for bagian in params.split(","))
+        params = (int(nilai["n"]), int(nilai["r"]), int(nilai["p"]))
+    elif algoritma == "pbkdf2_sha256":
+        params = (int(params),)
+    else:
+        raise ValueError(f"Algoritma hash '{algoritma}' tidak dikenal")
+    return algoritma, params, _unb64(salt), _unb64(hasil)
+
+
+def _hash(algoritma, params, password):
+    salt = os.urandom(16)
+    return _encode(algoritma, params, salt, _derive(algoritma, password, salt, params))
+
+
+def _verify(password, encoded):
+    algoritma, params, salt, hasil = _decode(encoded)
+    if algoritma == "sha256":
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hasil)
+    return hmac.compare_digest(_derive(algoritma, password, salt, params), hasil)
+
+
+class PasswordHasher:
+    """
+    Hash dan verifikasi password dengan KDF bersalt.
+
+    - algoritma       : "scrypt" (default) atau "pbkdf2_sha256"
+    - n, r, p         : biaya scrypt (memori ~ 128 * n * r byte)
+    - iterasi         : biaya PBKDF2
+    - workers         : ukuran process pool untuk menghitung KDF, agar
+                        login/register yang CPU-bound tidak menahan GIL
+                        dan berjalan paralel di semua core. None = jumlah
+                        CPU. Default 0: hitung langsung di thread pemanggil
+                        (tanpa proses tambahan, cukup untuk CLI).
+
+    Pool (workers > 0) dibuat saat pertama dipakai (start method spawn,
+    aman walau aplikasi sudah punya thread lain, tetapi script pemanggil
+    wajib memakai guard if __name__ == "__main__") dan ditutup dengan
+    close(). Di dalam proses anak multiprocessing, close() wajib dipanggil
+    sebelum proses selesai; worker pool yang masih hidup membuat proses
+    anak menunggu selamanya saat exit.
+    """
+    def __init__(self, algoritma="scrypt", n=2**14, r=8, p=1, iterasi=600000, workers=0):
+        if algoritma not in ALGORITMA:
+            raise ValueError(f"Algoritma '{algoritma}' tidak dikenal, pilih salah satu: {', '.join(ALGORITMA)}")
+        self._algoritma = algoritma
+        self._params = (n, r, p) if algoritma == "scrypt" else (iterasi,)
+        self._workers = (os.cpu_count() or 1) if workers is None else workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def algoritma(self):
+        return self._algoritma
+
+    @property
+    def params(self):
+        return self._params
+
+    def _jalankan(self, fn, *args):
+        if self._workers == 0:
+            return fn(*args)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool.submit(fn, *args).result()
+
+    def hash(self, password):
+        """Hash baru dengan salt acak dan biaya saat ini."""
+        return self._jalankan(_hash, self._algoritma, self._params, password)
+
+    def verify(self, password, encoded):
+        """True jika password cocok dengan hash tersimpan (format apa pun)."""
+        return self._jalankan(_verify, password, encoded)
+
+    def perlu_upgrade(self, encoded):
+        """
+        True jika hash tersimpan memakai format lama (sha256) atau
+        algoritma/biaya yang berbeda dari pengaturan saat ini.
+        """
+        algoritma, params, _, _ = _decode(encoded)
+        return algoritma != self._algoritma or params != self._params
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+def hash_password(password, algoritma="scrypt", n=2**14, r=8, p=1, iterasi=600000):
+    """Hash sekali pakai tanpa process pool (misal untuk seed admin)."""
+    return _hash(algoritma, (n, r, p) if algoritma == "scrypt" else (iterasi,), password)
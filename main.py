@@ -1,4 +1,7 @@
+import argparse
+import atexit
 import os
+import time
 
 # Import custom exception untuk penanganan error
 from Exceptions.exceptions import (
@@ -13,6 +16,8 @@ from Models.models import Keranjang
 
 # Import repository (untuk akses database)
 from Repository.repository import (
+    PROFIL_STORAGE,
+    CachedProdukRepository,
     Database,
     ProdukRepository,
     TransaksiRepository,
@@ -20,15 +25,20 @@ from Repository.repository import (
 )
 
 # Import service (untuk logika bisnis)
+from Services.export import TransaksiExporter
 from Services.services import (
     COD,
     AuthService,
     CheckoutService,
     CreditCard,
     EWallet,
+    LaporanService,
     ProdukService
 )
 
+# Import metrik (tracer dan export Prometheus)
+from Utils.metrics import PrometheusFileExporter, serve_prometheus, tracer
+
 
 # CLASS APLIKASI UTAMA (CLI)
 class App:
@@ -37,17 +47,24 @@ class App:
     Mengatur alur program, menu, dan interaksi user.
     """
 
-    def __init__(self):
+    # Jumlah produk per halaman pada menu "Lihat Produk"
+    PRODUK_PER_HALAMAN = 20
+
+    def __init__(self, db_name="ecommerce.db", profile="durable", profil_sql=None):
         """
         Inisialisasi seluruh dependency aplikasi.
+        profil_sql: ambang query lambat (ms) untuk mengaktifkan profiler
+        query; ringkasannya dicetak saat aplikasi keluar.
         """
 
         # Inisialisasi database
-        self._db = Database()
+        self._db = Database(db_name, profile=profile)
+        if profil_sql is not None:
+            self._db.enable_profiler(profil_sql, dump_on_exit=True)
 
         # Inisialisasi repository
         self._user_repo = UserRepository(self._db)
-        self._produk_repo = ProdukRepository(self._db)
+        self._produk_repo = CachedProdukRepository(self._db)
         self._trx_repo = TransaksiRepository(self._db)
 
         # Inisialisasi service (business logic)
@@ -151,6 +168,29 @@ class App:
         input("Enter...")
 
 
+    # DAFTAR PRODUK
+    def _lihat_produk(self):
+        """
+        Menampilkan produk per halaman (keyset pagination).
+        """
+        after_id = 0
+        while True:
+            page = self._produk_repo.findPage(after_id, self.PRODUK_PER_HALAMAN)
+            if not page and after_id == 0:
+                print("Belum ada produk")
+
+            for pr in page:
+                print(pr.id, pr.nama, pr.harga, pr.stok)
+
+            if len(page) < self.PRODUK_PER_HALAMAN:
+                input("Enter...")
+                return
+
+            if input("Enter = halaman berikutnya, q = kembali: ").lower() == "q":
+                return
+            after_id = page[-1].id
+
+
     # MENU ADMIN
     def _menu_admin(self):
         """
@@ -169,10 +209,8 @@ class App:
             p = input("Pilih: ")
 
             if p == "1":
-                # Menampilkan semua produk
-                for pr in self._produk_repo.findAll():
-                    print(pr.id, pr.nama, pr.harga, pr.stok)
-                input("Enter...")
+                # Menampilkan produk per halaman
+                self._lihat_produk()
 
             elif p == "2":
                 # Menambah produk baru
@@ -246,15 +284,14 @@ class App:
             print("3. Lihat Keranjang")
             print("4. Checkout")
             print("5. Riwayat Transaksi")
-            print("6. Logout")
+            print("6. Cari Produk")
+            print("7. Logout")
 
             p = input("Pilih: ")
 
             if p == "1":
-                # Menampilkan produk
-                for pr in self._produk_repo.findAll():
-                    print(pr.id, pr.nama, pr.harga, pr.stok)
-                input("Enter...")
+                # Menampilkan produk per halaman
+                self._lihat_produk()
 
             elif p == "2":
                 # Tambah produk ke keranjang
@@ -287,8 +324,9 @@ class App:
                     input("Enter...")
                     continue
 
+                produk_map = self._produk_repo.findByIds(items.keys())
                 for pid, qty in items.items():
-                    produk = self._produk_repo.findById(pid)
+                    produk = produk_map.get(pid)
                     if produk:
                         print(
                             f"{produk.nama} | "
@@ -371,9 +409,169 @@ class App:
                 input("Enter...")
 
             elif p == "6":
+                # Cari produk berdasarkan nama
+                hasil = self._produk_service.cariProduk(input("Kata kunci: "))
+                if not hasil:
+                    print("Produk tidak ditemukan")
+
+                for pr in hasil:
+                    print(pr.id, pr.nama, pr.harga, pr.stok)
+                input("Enter...")
+
+            elif p == "7":
                 break
 
 
+# PERINTAH NON-INTERAKTIF
+def buka_database(args):
+    """
+    Membuka database sesuai opsi global (--db, --profile, --profil-sql).
+    """
+    db = Database(args.db, profile=args.profile)
+    if args.profil_sql is not None:
+        db.enable_profiler(args.profil_sql, dump_on_exit=True)
+    return db
+
+
+def aktifkan_metrics(args):
+    """
+    Mengaktifkan span/metrik service jika --metrics-port atau
+    --metrics-file diberikan.
+    """
+    if args.metrics_port is None and args.metrics_file is None:
+        return
+    registry = tracer.enable()
+    if args.metrics_port is not None:
+        serve_prometheus(registry, args.metrics_port)
+        print(f"Metrik Prometheus di http://127.0.0.1:{args.metrics_port}/metrics")
+    if args.metrics_file is not None:
+        exporter = PrometheusFileExporter(registry, args.metrics_file).start()
+        atexit.register(exporter.stop)
+
+
+def import_produk(args):
+    """
+    Import katalog produk dari file CSV/JSONL.
+    """
+    db = buka_database(args)
+    service = ProdukService(ProdukRepository(db))
+    hasil = service.importProduk(
+        args.file,
+        format=args.format,
+        chunk_size=args.chunk,
+        rejects_path=args.rejects
+    )
+    db.close()
+
+    print(
+        f"{hasil['baris']} baris dibaca, {hasil['diterima']} diterima, "
+        f"{hasil['ditolak']} ditolak dalam {hasil['detik']:.1f} detik "
+        f"({hasil['baris_per_detik']:.0f} baris/detik)"
+    )
+    if hasil["ditolak"] and args.rejects:
+        print(f"Baris yang ditolak ditulis ke {args.rejects}")
+
+
+def export_transaksi(args):
+    """
+    Export transaksi + detail item ke CSV/JSONL (opsional gzip).
+    """
+    db = buka_database(args)
+    exporter = TransaksiExporter(TransaksiRepository(db))
+    mulai = time.perf_counter()
+    jumlah = exporter.export(
+        args.file,
+        format=args.format,
+        dari=args.dari,
+        sampai=args.sampai,
+        id_min=args.id_min,
+        id_max=args.id_max,
+        batch=args.batch
+    )
+    db.close()
+
+    durasi = time.perf_counter() - mulai
+    print(f"{jumlah} baris ditulis ke {args.file} dalam {durasi:.1f} detik")
+
+
+def rebuild_ringkasan(args):
+    """
+    Membangun ulang tabel ringkasan penjualan dari data transaksi.
+    """
+    db = buka_database(args)
+    mulai = time.perf_counter()
+    LaporanService(TransaksiRepository(db)).rebuild()
+    db.close()
+    print(f"Ringkasan dibangun ulang dalam {time.perf_counter() - mulai:.1f} detik")
+
+
+def laporan(args):
+    """
+    Menampilkan laporan penjualan dari tabel ringkasan.
+    """
+    db = buka_database(args)
+    service = LaporanService(TransaksiRepository(db))
+
+    print("=== PENDAPATAN HARIAN ===")
+    for tanggal, jumlah, pendapatan, unit in service.pendapatanHarian(args.dari, args.sampai):
+        print(f"{tanggal} | Transaksi: {jumlah} | Unit: {unit} | Pendapatan: {pendapatan}")
+
+    print(f"=== {args.top} PRODUK TERLARIS ===")
+    for pid, nama, unit, pendapatan in service.produkTerlaris(args.top):
+        print(f"{pid} {nama} | Unit: {unit} | Pendapatan: {pendapatan}")
+
+    print("=== PENDAPATAN PER METODE PEMBAYARAN ===")
+    for metode, jumlah, pendapatan in service.pendapatanPerMetode():
+        print(f"{metode} | Transaksi: {jumlah} | Pendapatan: {pendapatan}")
+    db.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Aplikasi E-Commerce CLI")
+    parser.add_argument("--db", default="ecommerce.db", help="file database SQLite")
+    parser.add_argument("--profile", default="durable", choices=list(PROFIL_STORAGE))
+    parser.add_argument(
+        "--profil-sql", type=float, metavar="MS",
+        help="aktifkan profiler query: log query > MS ms, cetak ringkasan saat keluar"
+    )
+    parser.add_argument("--metrics-port", type=int, help="endpoint HTTP lokal /metrics (Prometheus)")
+    parser.add_argument("--metrics-file", help="tulis metrik Prometheus ke file (setiap 15 detik dan saat keluar)")
+    sub = parser.add_subparsers(dest="perintah")
+
+    p = sub.add_parser("import-produk", help="import katalog produk dari CSV/JSONL")
+    p.add_argument("file")
+    p.add_argument("--format", choices=["csv", "jsonl"], help="default: dari ekstensi file")
+    p.add_argument("--chunk", type=int, default=5000, help="baris per transaksi")
+    p.add_argument("--rejects", help="file JSONL untuk baris yang ditolak")
+    p.set_defaults(fungsi=import_produk)
+
+    p = sub.add_parser("export-transaksi", help="export transaksi + item ke CSV/JSONL (.gz = gzip)")
+    p.add_argument("file")
+    p.add_argument("--format", choices=["csv", "jsonl"], help="default: dari ekstensi file")
+    p.add_argument("--dari", help="created_at >= (UTC), misal 2026-01-01")
+    p.add_argument("--sampai", help="created_at < (UTC), misal 2026-02-01")
+    p.add_argument("--id-min", type=int)
+    p.add_argument("--id-max", type=int)
+    p.add_argument("--batch", type=int, default=1000, help="baris per fetchmany")
+    p.set_defaults(fungsi=export_transaksi)
+
+    p = sub.add_parser("rebuild-ringkasan", help="bangun ulang tabel ringkasan penjualan")
+    p.set_defaults(fungsi=rebuild_ringkasan)
+
+    p = sub.add_parser("laporan", help="tampilkan laporan penjualan dari ringkasan")
+    p.add_argument("--dari", help="tanggal awal, misal 2026-01-01")
+    p.add_argument("--sampai", help="tanggal akhir (inklusif)")
+    p.add_argument("--top", type=int, default=10, help="jumlah produk terlaris")
+    p.set_defaults(fungsi=laporan)
+
+    return parser.parse_args(argv)
+
+
 # ENTRY POINT PROGRAM
 if __name__ == "__main__":
-    App().run()
+    args = parse_args()
+    aktifkan_metrics(args)
+    if args.perintah:
+        args.fungsi(args)
+    else:
+        App(args.db, args.profile, args.profil_sql).run()